@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR         = os.path.dirname(os.path.abspath(__file__))
+STARTUP_DELAY    = 0.5
+DEFAULT_CLIENTS  = 4
+DEFAULT_REQUESTS = 10
+DEFAULT_OUTPUT   = "benchmark_ipc.json"
+PERCENTILES      = (50, 95, 99)
+ZAD2_BUFFER      = "buffer.txt"
+ZAD2_SLOTS       = 4
+ZAD2_RESPONDER   = ['--responder', 'benchmark_ipc:scripted_response']
+
+SCENARIOS = {
+    'zad1-slot':   {'exercise': 'zad1', 'server_args': [],                      'single_client': True},
+    'zad1-spool':  {'exercise': 'zad1', 'server_args': ['--spool', 'spool'],    'single_client': False},
+    'zad1-mmap':   {'exercise': 'zad1', 'server_args': ['--transport', 'mmap'], 'single_client': False},
+    'zad2':        {'exercise': 'zad2', 'server_args': [ZAD2_BUFFER] + ZAD2_RESPONDER,
+                    'single_client': False, 'lock_mode': 'lockfile', 'slots': 1},
+    'zad2-flock':  {'exercise': 'zad2', 'server_args': [ZAD2_BUFFER] + ZAD2_RESPONDER,
+                    'single_client': False, 'lock_mode': 'flock', 'slots': 1},
+    'zad2-ticket': {'exercise': 'zad2', 'server_args': [ZAD2_BUFFER] + ZAD2_RESPONDER,
+                    'single_client': False, 'lock_mode': 'ticket', 'slots': 1},
+    'zad2-slots':  {'exercise': 'zad2',
+                    'server_args': [ZAD2_BUFFER, '--slots', str(ZAD2_SLOTS),
+                                    '--workers', str(ZAD2_SLOTS)] + ZAD2_RESPONDER,
+                    'single_client': False, 'lock_mode': 'lockfile', 'slots': ZAD2_SLOTS},
+}
+
+def main():
+    args    = parse_args()
+    results = []
+
+    for name in args.scenario or list(SCENARIOS):
+        scenario = SCENARIOS[name]
+        clients  = 1 if scenario['single_client'] else args.clients
+        print(f"Running {name}: {clients} client(s) x {args.requests} request(s)...")
+
+        result = run_scenario(name, scenario, clients, args.requests)
+        results.append(result)
+        print_result(result)
+
+    with open(args.output, 'w') as f:
+        json.dump({'created': time.time(), 'results': results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Throughput and latency benchmark for the file based IPC exercises'
+    )
+    parser.add_argument(
+        '--scenario',
+        action='append',
+        choices=list(SCENARIOS),
+        help='Scenario to run (may be repeated, default: all)'
+    )
+    parser.add_argument(
+        '--clients',
+        type=int,
+        default=DEFAULT_CLIENTS,
+        help='Number of concurrent client processes'
+    )
+    parser.add_argument(
+        '--requests',
+        type=int,
+        default=DEFAULT_REQUESTS,
+        help='Number of requests sent by each client'
+    )
+    parser.add_argument(
+        '--output',
+        default=DEFAULT_OUTPUT,
+        help='Path of the JSON results file'
+    )
+    return parser.parse_args()
+
+def load_exercise_module(exercise: str, name: str):
+    directory = os.path.join(ROOT_DIR, exercise)
+    sys.path.insert(0, directory)
+    spec   = importlib.util.spec_from_file_location(name, os.path.join(directory, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def silence_stdout() -> None:
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.close(devnull)
+
+def scripted_response(message_lines: list[str]) -> str:
+    first_line = message_lines[0] if message_lines else ''
+    return f"ack: {first_line}"
+
+def serve(exercise: str, server_args: list[str], workdir: str) -> None:
+    os.chdir(workdir)
+    silence_stdout()
+    server = load_exercise_module(exercise, 'server')
+
+    sys.argv = [server.__file__] + server_args
+    server.main()
+
+def run_client(name: str, worker: int, requests: int, workdir: str, queue) -> None:
+    os.chdir(workdir)
+    silence_stdout()
+    exercise = SCENARIOS[name]['exercise']
+    client   = load_exercise_module(exercise, 'client')
+
+    latencies, errors = [], 0
+    for n in range(requests):
+        start = time.perf_counter()
+        try: ok = send_request(name, client, worker, n)
+        except Exception: ok = False
+
+        if ok: latencies.append(time.perf_counter() - start)
+        else: errors += 1
+
+    queue.put((latencies, errors))
+
+def send_request(name: str, client, worker: int, n: int) -> bool:
+    if name == 'zad1-slot':  return client.request_via_data_file(n, True) == n**2
+    if name == 'zad1-spool': return client.request_via_spool('spool', n, True) == n**2
+    if name == 'zad1-mmap':  return client.request_via_shared_slot(client.SHARED_FILE, n) == n**2
+
+    scenario      = SCENARIOS[name]
+    response_file = f"response_{worker}.txt"
+    message       = f"client {worker} request {n}"
+    client.cleanup_response_file(response_file)
+    ready = client.exchange_message(
+        ZAD2_BUFFER, response_file, [message], scenario['lock_mode'], scenario['slots']
+    )
+    response = client.read_response(response_file) if ready else None
+    client.cleanup_response_file(response_file)
+    return response == f"ack: {message}"
+
+def run_scenario(name: str, scenario: dict, clients: int, requests: int) -> dict:
+    context = multiprocessing.get_context('fork')
+    queue   = context.Queue()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server = context.Process(
+            target=serve, args=(scenario['exercise'], scenario['server_args'], workdir)
+        )
+        server.start()
+        time.sleep(STARTUP_DELAY)
+
+        try:
+            start   = time.perf_counter()
+            workers = [
+                context.Process(target=run_client, args=(name, worker, requests, workdir, queue))
+                for worker in range(clients)
+            ]
+            for worker in workers: worker.start()
+            reports = [queue.get() for _ in workers]
+            for worker in workers: worker.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.join()
+
+    latencies = sorted(latency for report, _ in reports for latency in report)
+    errors    = sum(errors for _, errors in reports)
+    return summarize(name, clients, requests, elapsed, latencies, errors)
+
+def percentile(sorted_values: list[float], p: int) -> float | None:
+    if not sorted_values: return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(name: str, clients: int, requests: int, elapsed: float,
+              latencies: list[float], errors: int) -> dict:
+    result = {
+        'scenario':            name,
+        'clients':             clients,
+        'requests_per_client': requests,
+        'completed':           len(latencies),
+        'errors':              errors,
+        'elapsed_s':           elapsed,
+        'requests_per_s':      len(latencies) / elapsed if elapsed > 0 else 0.0,
+    }
+    for p in PERCENTILES:
+        value = percentile(latencies, p)
+        result[f'p{p}_ms'] = value * 1000 if value is not None else None
+    return result
+
+def print_result(result: dict) -> None:
+    latencies = ' | '.join(
+        f"p{p} {result[f'p{p}_ms']:9.2f} ms" if result[f'p{p}_ms'] is not None else f"p{p} n/a"
+        for p in PERCENTILES
+    )
+    print(f"  {result['requests_per_s']:10.1f} req/s | {latencies} | errors {result['errors']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import client
+from shared_slot import SHARED_FILE, SharedSlot
+from watch import BackoffWatcher, create_watcher
+
+SERVER_SCRIPT   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+STARTUP_DELAY   = 0.5
+DEFAULT_ROUNDS  = 50
+DEFAULT_ITEMS   = 2000
+LATENCY_MODES   = {
+    'poll':    ['--poll'],
+    'inotify': [],
+    'mmap':    ['--transport', 'mmap'],
+}
+
+def main():
+    args = parse_args()
+
+    print(f"=== zad1 round-trip benchmark ({args.rounds} requests per mode) ===")
+    for mode, server_flags in LATENCY_MODES.items():
+        with running_server(server_flags):
+            latencies = measure_latencies(mode, args.rounds)
+        print_summary(mode, latencies)
+
+    print(f"\n=== zad1 throughput benchmark ({args.items} items) ===")
+    values = list(range(args.items))
+    with running_server([]):
+        print_throughput('per-item', args.items, measure_per_item(values))
+        print_throughput('text batch', args.items, measure_batch(values, binary=False))
+        print_throughput('binary batch', args.items, measure_batch(values, binary=True))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Latency and throughput benchmark for zad1')
+    parser.add_argument(
+        '--rounds',
+        type=int,
+        default=DEFAULT_ROUNDS,
+        help='Number of requests sent in each latency mode'
+    )
+    parser.add_argument(
+        '--items',
+        type=int,
+        default=DEFAULT_ITEMS,
+        help='Number of integers evaluated in the throughput comparison'
+    )
+    return parser.parse_args()
+
+@contextmanager
+def running_server(server_flags: list[str]):
+    server_args = [sys.executable, SERVER_SCRIPT] + server_flags
+
+    with tempfile.TemporaryDirectory() as workdir:
+        previous_dir = os.getcwd()
+        os.chdir(workdir)
+        server = subprocess.Popen(server_args, stdout=subprocess.DEVNULL)
+        try:
+            time.sleep(STARTUP_DELAY)
+            yield
+        finally:
+            server.terminate()
+            server.wait()
+            os.chdir(previous_dir)
+
+def measure_latencies(mode: str, rounds: int) -> list[float]:
+    if mode != 'mmap': return [measure_round_trip(n, mode) for n in range(rounds)]
+
+    client.transport = SharedSlot(SHARED_FILE)
+    try: return [measure_round_trip(n, mode) for n in range(rounds)]
+    finally:
+        client.transport.close()
+        client.transport = None
+
+def measure_round_trip(n: int, mode: str) -> float:
+    client.clear_result()
+    if mode == 'mmap': watcher = BackoffWatcher(client.MMAP_POLL, client.MMAP_POLL_MAX)
+    else: watcher = create_watcher(client.RESULT_FILE, client.POLL_INTERVAL, mode == 'inotify')
+
+    try:
+        start = time.perf_counter()
+        client.send_integer_to_data_file(n)
+        result = client.wait_for_result(None if mode == 'poll' else watcher)
+        elapsed = time.perf_counter() - start
+    finally:
+        watcher.close()
+
+    if result != n**2: raise RuntimeError(f"Unexpected result for {n}: {result}")
+    return elapsed
+
+def measure_per_item(values: list[int]) -> float:
+    start = time.perf_counter()
+    for n in values: measure_round_trip(n, 'inotify')
+    return time.perf_counter() - start
+
+def measure_batch(values: list[int], binary: bool) -> float:
+    start = time.perf_counter()
+    results = client.request_batch(values, binary, True)
+    elapsed = time.perf_counter() - start
+
+    if results != [n**2 for n in values]: raise RuntimeError("Unexpected batch results")
+    return elapsed
+
+def print_summary(mode: str, latencies: list[float]) -> None:
+    millis = sorted(latency * 1000 for latency in latencies)
+    print(f"{mode:>8}: mean {statistics.mean(millis):8.2f} ms | "
+          f"median {statistics.median(millis):8.2f} ms | "
+          f"max {millis[-1]:8.2f} ms")
+
+def print_throughput(mode: str, items: int, elapsed: float) -> None:
+    print(f"{mode:>12}: {elapsed * 1000:9.2f} ms total | {items / elapsed:12.0f} items/s")
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,55 @@
 #!/usr/bin/env python3
+import argparse
 import os
+import sys
 import time
+from array import array
 
-DATA_FILE     = "data.txt"
-RESULT_FILE   = "result.txt"
-POLL_INTERVAL = 0.1
-TIMEOUT       = 30
+from shared_slot import SHARED_FILE, SharedSlot, SlotNotReady
+from watch import BackoffWatcher, create_watcher
+
+DATA_FILE      = "data.txt"
+RESULT_FILE    = "result.txt"
+POLL_INTERVAL  = 0.1
+WATCH_TIMEOUT  = 1.0
+TIMEOUT        = 30
+REQUEST_SUFFIX = ".req"
+RESULT_SUFFIX  = ".res"
+TEMP_SUFFIX    = ".tmp"
+BATCH_HEADER   = "batch"
+BINARY_MAGIC   = b"ZAD1BIN\n"
+BINARY_INPUT   = 'i'
+BINARY_OUTPUT  = 'q'
+MMAP_POLL      = 0.0002
+MMAP_POLL_MAX  = 0.01
+
+transport = None
 
 def main():
+    args = parse_args()
+
     print("=== Client file communication ===")
+    if args.batch:
+        run_batch(args.batch, args.binary, not args.poll)
+        return
+    
     try:
         number_str = input("Enter an integer: ")
         number     = int(number_str)
         
-        clear_file(RESULT_FILE)
-        
-        print(f"Sending number {number} to server...")
-        send_integer_to_data_file(number)
-        
-        print("Waiting for response from server...")
-        result = wait_for_result()
+        if args.spool: result = request_via_spool(args.spool, number, not args.poll)
+        elif args.transport == 'mmap': result = request_via_shared_slot(args.shared_file, number)
+        else: result = request_via_data_file(number, not args.poll)
         
         if result is not None:
             print(f"\nReceived result: f({number}) = {result}")
-            clear_file(RESULT_FILE)
         else:
             print(f"\nTimeout: No response in {TIMEOUT} seconds.")
             print("Check if server is running.")
     
+    except SlotNotReady as e:
+        print(f"Error: {e}")
+        print("Check if server is running.")
     except ValueError:
         print("Error: check if you entered an integer.")
     except KeyboardInterrupt:
@@ -35,31 +57,205 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='File based squaring client')
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='Poll the result file instead of waiting for inotify events'
+    )
+    parser.add_argument(
+        '--spool',
+        metavar='DIR',
+        help='Send the request through the server spool directory'
+    )
+    parser.add_argument(
+        '--batch',
+        metavar='FILE',
+        help="Send all integers from FILE ('-' for stdin) in a single request"
+    )
+    parser.add_argument(
+        '--binary',
+        action='store_true',
+        help='Encode the batch as a packed array of 32-bit integers'
+    )
+    parser.add_argument(
+        '--transport',
+        choices=['file', 'mmap'],
+        default='file',
+        help='Exchange the request through data/result files or the shared mmap file'
+    )
+    parser.add_argument(
+        '--shared-file',
+        default=SHARED_FILE,
+        help='Path of the shared file used by the mmap transport'
+    )
+    return parser.parse_args()
+
+def run_batch(source: str, binary: bool, use_inotify: bool) -> None:
+    try:
+        values = read_batch_values(source)
+    except ValueError:
+        print("Error: batch file must contain only integers.")
+        return
+    
+    try:
+        results = request_batch(values, binary, use_inotify)
+    except (OverflowError, ValueError) as e:
+        print(f"Error: {e}")
+        return
+    
+    if results is None:
+        print(f"\nTimeout: No response in {TIMEOUT} seconds.")
+        print("Check if server is running.")
+        return
+    
+    for number, result in zip(values, results):
+        print(f"f({number}) = {result}")
+
+def read_batch_values(source: str) -> list[int]:
+    if source == '-': return [int(token) for token in sys.stdin.read().split()]
+    with open(source, 'r') as f: return [int(token) for token in f.read().split()]
+
+def request_batch(values: list[int], binary: bool, use_inotify: bool) -> list[int] | None:
+    clear_file(RESULT_FILE)
+    watcher = create_watcher(RESULT_FILE, POLL_INTERVAL, use_inotify)
+    
+    print(f"Sending batch of {len(values)} number(s) to server...")
+    send_batch_to_data_file(values, binary)
+    
+    print("Waiting for response from server...")
+    try: results = wait_for_batch_result(len(values), watcher)
+    finally: watcher.close()
+    
+    if results is not None: clear_file(RESULT_FILE)
+    return results
+
+def send_batch_to_data_file(values: list[int], binary: bool) -> None:
+    if binary: content = BINARY_MAGIC + array(BINARY_INPUT, values).tobytes()
+    else: content = (BATCH_HEADER + '\n' + ' '.join(map(str, values))).encode()
+    
+    with open(DATA_FILE + TEMP_SUFFIX, 'wb') as f: f.write(content)
+    os.replace(DATA_FILE + TEMP_SUFFIX, DATA_FILE)
+
+def wait_for_batch_result(count: int, watcher=None) -> list[int] | None:
+    start_time = time.time()
+    
+    while True:
+        results = get_batch_result_from_result_file(count)
+        
+        if results is not None: return results
+        
+        remaining = TIMEOUT - (time.time() - start_time)
+        if remaining <= 0: return None
+        
+        if watcher is None: time.sleep(POLL_INTERVAL)
+        else: watcher.wait(min(remaining, WATCH_TIMEOUT))
+
+def get_batch_result_from_result_file(count: int) -> list[int] | None:
+    try:
+        with open(RESULT_FILE, 'rb') as f: content = f.read()
+    except IOError: return None
+    
+    try:
+        if content.startswith(BINARY_MAGIC):
+            results = array(BINARY_OUTPUT)
+            results.frombytes(content[len(BINARY_MAGIC):])
+            results = results.tolist()
+        else:
+            header, _, body = content.decode().partition('\n')
+            if header.strip() != BATCH_HEADER: return None
+            results = [int(token) for token in body.split()]
+    except ValueError: return None
+    
+    return results if len(results) == count else None
+
+def request_via_shared_slot(shared_file: str, number: int) -> int | None:
+    global transport
+    transport = SharedSlot(shared_file)
+    
+    try:
+        transport.lock()
+        try: return request_via_data_file(number, use_inotify=False)
+        finally: transport.unlock()
+    finally:
+        transport.close()
+        transport = None
+
+def request_via_data_file(number: int, use_inotify: bool) -> int | None:
+    clear_result()
+    if transport is not None: watcher = BackoffWatcher(MMAP_POLL, MMAP_POLL_MAX)
+    else: watcher = create_watcher(RESULT_FILE, POLL_INTERVAL, use_inotify)
+    
+    print(f"Sending number {number} to server...")
+    send_integer_to_data_file(number)
+    
+    print("Waiting for response from server...")
+    try: result = wait_for_result(watcher)
+    finally: watcher.close()
+    
+    if result is not None: clear_result()
+    return result
+
+def request_via_spool(spool_dir: str, number: int, use_inotify: bool) -> int | None:
+    request_id  = new_request_id()
+    result_file = os.path.join(spool_dir, request_id + RESULT_SUFFIX)
+    watcher     = create_watcher(result_file, POLL_INTERVAL, use_inotify)
+    
+    print(f"Sending number {number} to spool '{spool_dir}' as request {request_id}...")
+    send_spool_request(spool_dir, request_id, number)
+    
+    print("Waiting for response from server...")
+    try: result = wait_for_result(watcher, result_file)
+    finally: watcher.close()
+    
+    remove_file(result_file)
+    return result
+
+def new_request_id() -> str:
+    return f"{time.time_ns()}-{os.getpid()}"
+
+def send_spool_request(spool_dir: str, request_id: str, n: int) -> None:
+    request_file = os.path.join(spool_dir, request_id + REQUEST_SUFFIX)
+    write_file(request_file + TEMP_SUFFIX, str(n))
+    os.replace(request_file + TEMP_SUFFIX, request_file)
+
+def remove_file(filename: str) -> None:
+    try: os.remove(filename)
+    except OSError: pass
+
 def clear_file(filename: str) -> None:
     try: write_file(filename, '')
     except IOError: pass
 
+def clear_result() -> None:
+    if transport is None: clear_file(RESULT_FILE)
+
 def send_integer_to_data_file(n: int) -> None:
-    write_file(DATA_FILE, str(n))
+    if transport is not None: transport.send_request(n)
+    else: write_file(DATA_FILE, str(n))
 
 def write_file(filename: str, content: str) -> None:
     with open(filename, 'w') as f: f.write(content)
 
-def wait_for_result() -> int | None:
+def wait_for_result(watcher=None, result_file: str = RESULT_FILE) -> int | None:
     start_time = time.time()
     
     while True:
-        result = get_result_from_result_file()
+        result = get_result_from_result_file(result_file)
         
         if result is not None: return result
         
-        if time.time() - start_time > TIMEOUT: return None
+        remaining = TIMEOUT - (time.time() - start_time)
+        if remaining <= 0: return None
         
-        time.sleep(POLL_INTERVAL)
+        if watcher is None: time.sleep(POLL_INTERVAL)
+        else: watcher.wait(min(remaining, WATCH_TIMEOUT))
 
-def get_result_from_result_file() -> int | None:
-    if not os.path.exists(RESULT_FILE): return None
-    try: return int(read_file(RESULT_FILE))
+def get_result_from_result_file(result_file: str = RESULT_FILE) -> int | None:
+    if transport is not None: return transport.read_response()
+    if not os.path.exists(result_file): return None
+    try: return int(read_file(result_file))
     except (ValueError, IOError): return None
 
 def read_file(filename: str) -> str:
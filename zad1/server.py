@@ -1,16 +1,93 @@
 #!/usr/bin/env python3
+import argparse
 import os
-import time
+from array import array
 
-DATA_FILE     = "data.txt"
-RESULT_FILE   = "result.txt"
-POLL_INTERVAL = 0.1
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from shared_slot import SHARED_FILE, SharedSlot
+from watch import BackoffWatcher, create_directory_watcher, create_watcher
+
+DATA_FILE        = "data.txt"
+RESULT_FILE      = "result.txt"
+POLL_INTERVAL    = 0.1
+WATCH_TIMEOUT    = 1.0
+REQUEST_SUFFIX   = ".req"
+RESULT_SUFFIX    = ".res"
+TEMP_SUFFIX      = ".tmp"
+SPOOL_BATCH_SIZE = 64
+BATCH_HEADER     = "batch"
+BINARY_MAGIC     = b"ZAD1BIN\n"
+BINARY_INPUT     = 'i'
+BINARY_OUTPUT    = 'q'
+INT32_MIN        = -2**31
+INT32_MAX        = 2**31 - 1
+MMAP_POLL        = 0.0002
+MMAP_POLL_MAX    = 0.05
+
+transport = None
 
 def main():
+    args = parse_args()
+
+    if args.spool: run_spool_server(args.spool, args.batch_size, not args.poll)
+    elif args.transport == 'mmap': run_shared_slot_server(args.shared_file)
+    else: run_single_slot_server(not args.poll)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='File based squaring server')
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='Poll the data file instead of waiting for inotify events'
+    )
+    parser.add_argument(
+        '--spool',
+        metavar='DIR',
+        help='Serve many clients through request files in a spool directory'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=SPOOL_BATCH_SIZE,
+        help='Maximum number of spool requests handled per wakeup'
+    )
+    parser.add_argument(
+        '--transport',
+        choices=['file', 'mmap'],
+        default='file',
+        help='Exchange requests through data/result files or one shared mmap file'
+    )
+    parser.add_argument(
+        '--shared-file',
+        default=SHARED_FILE,
+        help='Path of the shared file used by the mmap transport'
+    )
+    args = parser.parse_args()
+
+    if args.batch_size < 1: parser.error('--batch-size must be at least 1')
+    return args
+
+def run_shared_slot_server(shared_file: str) -> None:
+    global transport
+    transport = SharedSlot(shared_file, create=True)
+    print(f"Shared slot '{shared_file}' mapped ({os.path.getsize(shared_file)} bytes)")
+    
+    try: run_single_slot_server(use_inotify=False)
+    finally: transport.close()
+
+def run_single_slot_server(use_inotify: bool) -> None:
     print("Server started. Waiting for client requests...")
     
-    clear_file(DATA_FILE)
-    clear_file(RESULT_FILE)
+    clear_data()
+    clear_result()
+    
+    if transport is not None: watcher = BackoffWatcher(MMAP_POLL, MMAP_POLL_MAX)
+    else: watcher = create_watcher(DATA_FILE, POLL_INTERVAL, use_inotify)
+    print(f"Waiting for requests using {type(watcher).__name__}")
     
     try:
         while True:
@@ -23,17 +100,78 @@ def main():
                 print(f"Calculated: f({data}) = {result}")
                 
                 write_result(result)
-                print(f"Result saved to file '{RESULT_FILE}'")
+                print("Result sent to client")
                 
-                clear_file(DATA_FILE)
-                print("File 'data' cleared. Waiting for next request...\n")
+                clear_data()
+                print("Request slot cleared. Waiting for next request...\n")
+                watcher.reset()
+            elif transport is None:
+                handle_batch()
+            
+            watcher.wait(WATCH_TIMEOUT)
+            
+    except KeyboardInterrupt:
+        print("\n\nServer stopped.")
+        clear_data()
+        clear_result()
+    finally:
+        watcher.close()
+
+def run_spool_server(spool_dir: str, batch_size: int, use_inotify: bool) -> None:
+    os.makedirs(spool_dir, exist_ok=True)
+    print(f"Server started. Waiting for requests in spool directory '{spool_dir}'...")
+    
+    watcher = create_directory_watcher(
+        spool_dir, lambda name: name.endswith(REQUEST_SUFFIX), POLL_INTERVAL, use_inotify
+    )
+    print(f"Watching '{spool_dir}' using {type(watcher).__name__}")
+    
+    try:
+        while True:
+            batch = list_spool_requests(spool_dir)[:batch_size]
+            
+            for request_id in batch:
+                handle_spool_request(spool_dir, request_id)
+            
+            if batch:
+                print(f"Handled batch of {len(batch)} request(s)")
             
-            time.sleep(POLL_INTERVAL)
+            if len(batch) < batch_size:
+                watcher.wait(WATCH_TIMEOUT)
             
     except KeyboardInterrupt:
         print("\n\nServer stopped.")
-        clear_file(DATA_FILE)
-        clear_file(RESULT_FILE)
+    finally:
+        watcher.close()
+
+def list_spool_requests(spool_dir: str) -> list[str]:
+    try: names = os.listdir(spool_dir)
+    except OSError: return []
+    
+    return sorted(name[:-len(REQUEST_SUFFIX)] for name in names if name.endswith(REQUEST_SUFFIX))
+
+def handle_spool_request(spool_dir: str, request_id: str) -> None:
+    request_path = os.path.join(spool_dir, request_id + REQUEST_SUFFIX)
+    
+    try: data = int(read_file(request_path))
+    except ValueError:
+        print(f"Invalid request '{request_id}', discarding")
+        remove_file(request_path)
+        return
+    
+    result = calculate_result(data)
+    print(f"[{request_id}] f({data}) = {result}")
+    
+    write_file_atomic(os.path.join(spool_dir, request_id + RESULT_SUFFIX), str(result))
+    remove_file(request_path)
+
+def write_file_atomic(filename: str, content: str) -> None:
+    write_file(filename + TEMP_SUFFIX, content)
+    os.replace(filename + TEMP_SUFFIX, filename)
+
+def remove_file(filename: str) -> None:
+    try: os.remove(filename)
+    except OSError: pass
 
 def clear_file(filename: str) -> None:
     try: write_file(filename, '')
@@ -42,7 +180,14 @@ def clear_file(filename: str) -> None:
 def write_file(filename: str, content: str) -> None:
     with open(filename, 'w') as f: f.write(content)
 
+def clear_data() -> None:
+    if transport is None: clear_file(DATA_FILE)
+
+def clear_result() -> None:
+    if transport is None: clear_file(RESULT_FILE)
+
 def get_data() -> int | None:
+    if transport is not None: return transport.read_request()
     if not os.path.exists(DATA_FILE): return None
     try: return int(read_file(DATA_FILE))
     except (ValueError, IOError): return None
@@ -59,7 +204,56 @@ def read_file(filename: str) -> str:
 def calculate_result(x: int) -> int: return x**2
 
 def write_result(result: int) -> None:
-    write_file(RESULT_FILE, str(result))
+    if transport is not None: transport.write_response(result)
+    else: write_file(RESULT_FILE, str(result))
+
+def handle_batch() -> None:
+    batch = get_batch()
+    if batch is None: return
+    
+    values, binary = batch
+    print(f"Received batch of {len(values)} number(s) ({'binary' if binary else 'text'})")
+    
+    results = calculate_results(values)
+    write_batch_result(results, binary)
+    print(f"Batch results saved to file '{RESULT_FILE}'")
+    
+    clear_file(DATA_FILE)
+    print("File 'data' cleared. Waiting for next request...\n")
+
+def get_batch() -> tuple[list[int], bool] | None:
+    try:
+        with open(DATA_FILE, 'rb') as f: content = f.read()
+    except IOError: return None
+    
+    try:
+        if content.startswith(BINARY_MAGIC):
+            values = array(BINARY_INPUT)
+            values.frombytes(content[len(BINARY_MAGIC):])
+            return values.tolist(), True
+        
+        header, _, body = content.decode().partition('\n')
+        if header.strip() != BATCH_HEADER: return None
+        return [int(token) for token in body.split()], False
+    except ValueError: return None
+
+def calculate_results(values: list[int]) -> list[int]:
+    if np is not None and values and INT32_MIN <= min(values) and max(values) <= INT32_MAX:
+        vector = np.asarray(values, dtype=np.int64)
+        return np.square(vector).tolist()
+    return [x * x for x in values]
+
+def write_batch_result(results: list[int], binary: bool) -> None:
+    if binary:
+        content = BINARY_MAGIC + array(BINARY_OUTPUT, results).tobytes()
+        write_bytes_atomic(RESULT_FILE, content)
+    else:
+        lines = [BATCH_HEADER] + [str(result) for result in results]
+        write_bytes_atomic(RESULT_FILE, '\n'.join(lines).encode())
+
+def write_bytes_atomic(filename: str, content: bytes) -> None:
+    with open(filename + TEMP_SUFFIX, 'wb') as f: f.write(content)
+    os.replace(filename + TEMP_SUFFIX, filename)
 
 if __name__ == "__main__":
     main()
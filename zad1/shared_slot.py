@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+import fcntl
+import mmap
+import os
+import struct
+
+SHARED_FILE    = "shared.bin"
+RESULT_BYTES   = 16
+SEQUENCE       = struct.Struct('<Q')
+REQUEST_VALUE  = struct.Struct('<q')
+REQUEST_SEQ    = 0
+REQUEST_OFFSET = REQUEST_SEQ + SEQUENCE.size
+RESPONSE_SEQ   = REQUEST_OFFSET + REQUEST_VALUE.size
+RESULT_OFFSET  = RESPONSE_SEQ + SEQUENCE.size
+SLOT_SIZE      = RESULT_OFFSET + RESULT_BYTES
+
+class SlotNotReady(OSError): pass
+
+class SharedSlot:
+    def __init__(self, path: str, create: bool = False):
+        flags = os.O_RDWR | (os.O_CREAT if create else 0)
+        try: self.fd = os.open(path, flags, 0o644)
+        except FileNotFoundError: raise SlotNotReady(f"Shared file '{path}' does not exist") from None
+
+        if create:
+            os.ftruncate(self.fd, 0)
+            os.ftruncate(self.fd, SLOT_SIZE)
+        elif os.fstat(self.fd).st_size < SLOT_SIZE:
+            os.close(self.fd)
+            raise SlotNotReady(f"Shared file '{path}' is not initialised by the server")
+
+        self.buffer      = mmap.mmap(self.fd, SLOT_SIZE)
+        self.pending_seq = None
+        self.sent_seq    = None
+
+    def read_sequence(self, offset: int) -> int:
+        return SEQUENCE.unpack_from(self.buffer, offset)[0]
+
+    def send_request(self, value: int) -> None:
+        seq = self.read_sequence(REQUEST_SEQ) + 1
+        REQUEST_VALUE.pack_into(self.buffer, REQUEST_OFFSET, value)
+        SEQUENCE.pack_into(self.buffer, REQUEST_SEQ, seq)
+        self.sent_seq = seq
+
+    def read_request(self) -> int | None:
+        seq = self.read_sequence(REQUEST_SEQ)
+        if seq == self.read_sequence(RESPONSE_SEQ): return None
+
+        self.pending_seq = seq
+        return REQUEST_VALUE.unpack_from(self.buffer, REQUEST_OFFSET)[0]
+
+    def write_response(self, result: int) -> None:
+        self.buffer[RESULT_OFFSET:SLOT_SIZE] = result.to_bytes(RESULT_BYTES, 'little', signed=True)
+        SEQUENCE.pack_into(self.buffer, RESPONSE_SEQ, self.pending_seq)
+        self.pending_seq = None
+
+    def read_response(self) -> int | None:
+        if self.sent_seq is None or self.read_sequence(RESPONSE_SEQ) != self.sent_seq: return None
+        return int.from_bytes(self.buffer[RESULT_OFFSET:SLOT_SIZE], 'little', signed=True)
+
+    def lock(self) -> None: fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def unlock(self) -> None: fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        self.buffer.close()
+        os.close(self.fd)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+WATCH_MASK     = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER   = struct.Struct('iIII')
+READ_SIZE      = 4096
+BACKOFF_FACTOR = 2
+
+class PollingWatcher:
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+
+    def wait(self, timeout: float | None = None) -> bool:
+        delay = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+        time.sleep(delay)
+        return True
+
+    def reset(self) -> None: pass
+
+    def close(self) -> None: pass
+
+class BackoffWatcher:
+    def __init__(self, min_interval: float, max_interval: float, factor: float = BACKOFF_FACTOR):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor       = factor
+        self.interval     = min_interval
+
+    def wait(self, timeout: float | None = None) -> bool:
+        delay = self.interval if timeout is None else min(timeout, self.interval)
+        time.sleep(delay)
+        self.interval = min(self.interval * self.factor, self.max_interval)
+        return True
+
+    def reset(self) -> None: self.interval = self.min_interval
+
+    def close(self) -> None: pass
+
+class InotifyWatcher:
+    def __init__(self, directory: str, matches, libc: ctypes.CDLL):
+        self.matches = matches
+        self.fd      = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        wd = libc.inotify_add_watch(self.fd, directory.encode(), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float | None = None) -> bool:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable: return False
+        return any(self.matches(os.fsdecode(name)) for name in self.read_event_names())
+
+    def reset(self) -> None: pass
+
+    def read_event_names(self) -> set[bytes]:
+        names = set()
+        while True:
+            try: buffer = os.read(self.fd, READ_SIZE)
+            except BlockingIOError: return names
+
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(buffer):
+                _, _, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                names.add(buffer[offset:offset + length].rstrip(b'\0'))
+                offset += length
+
+    def close(self) -> None:
+        try: os.close(self.fd)
+        except OSError: pass
+
+def load_libc() -> ctypes.CDLL | None:
+    path = ctypes.util.find_library('c')
+    if path is None: return None
+    try: libc = ctypes.CDLL(path, use_errno=True)
+    except OSError: return None
+    if not hasattr(libc, 'inotify_init1'): return None
+    return libc
+
+def create_watcher(filename: str, poll_interval: float, use_inotify: bool = True):
+    directory = os.path.dirname(os.path.abspath(filename))
+    name      = os.path.basename(filename)
+    return create_directory_watcher(directory, lambda n: n == name, poll_interval, use_inotify)
+
+def create_directory_watcher(directory: str, matches, poll_interval: float, use_inotify: bool = True):
+    libc = load_libc() if use_inotify else None
+    if libc is not None:
+        try: return InotifyWatcher(directory, matches, libc)
+        except OSError: pass
+    return PollingWatcher(poll_interval)
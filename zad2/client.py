@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 import argparse
+import fcntl
 import os
 import time
 import sys
 
+from framing import body_complete, copy_body, encode_header, read_body, read_header
+from polling import AdaptivePoller
+
 LOCKFILE_NAME          = "server.lock"
+FLOCK_SUFFIX           = ".flock"
+TICKET_DIR             = LOCKFILE_NAME + ".tickets"
+TICKET_COUNTER         = "counter"
+LOCK_MODES             = ('lockfile', 'flock', 'ticket')
 END_MARKER             = "\x1b"
 LOCK_RETRY_INTERVAL    = 2
+HANDOFF_RETRY_INTERVAL = 0.01
 RESPONSE_POLL_INTERVAL = 0.5
+MIN_POLL_INTERVAL      = 0.005
 RESPONSE_TIMEOUT       = 60
 ENCODING               = "utf-8"
 
@@ -15,7 +25,7 @@ def main():
     args = parse_args()
 
     try:
-        run_client(args.buffer_file, args.response_file)
+        run_client(args.buffer_file, args.response_file, args.lock_mode, args.slots, args.poll_stats)
     except KeyboardInterrupt:
         print("\n\nClient interrupted. Exiting...")
         cleanup_response_file(args.response_file)
@@ -33,10 +43,28 @@ def parse_args():
         'response_file',
         help='Path to the client response file'
     )
+    parser.add_argument(
+        '--lock-mode',
+        choices=LOCK_MODES,
+        default='lockfile',
+        help='lockfile: retry O_EXCL lockfile, flock: block in the kernel, '
+             'ticket: block in the kernel and serve clients in arrival order'
+    )
+    parser.add_argument(
+        '--slots',
+        type=int,
+        default=1,
+        help='Number of buffer slots offered by the server'
+    )
+    parser.add_argument(
+        '--poll-stats',
+        action='store_true',
+        help='Print wakeup/hit/miss counters of the response poller'
+    )
 
     return parser.parse_args()
 
-def run_client(buffer_file, response_file):
+def run_client(buffer_file, response_file, lock_mode='lockfile', slots=1, poll_stats=False):
     cleanup_response_file(response_file)
     
     message_lines = get_user_message()
@@ -45,17 +73,17 @@ def run_client(buffer_file, response_file):
         print("No message entered. Exiting.")
         sys.exit(0)
 
-    wait_for_lock()
-    
-    send_message(buffer_file, response_file, message_lines)
+    poller = AdaptivePoller(MIN_POLL_INTERVAL, RESPONSE_POLL_INTERVAL)
+    ready  = exchange_message(buffer_file, response_file, message_lines, lock_mode, slots, poller)
     
-    response = wait_for_response(response_file)
+    if poll_stats:
+        print(f"Polling stats: {poller.format_stats()}")
     
-    if response:
+    if ready:
         print()
         print("Server response:")
         print()
-        print(response)
+        stream_response(response_file, sys.stdout)
         print()
     else:
         print("Failed to receive response from server", file=sys.stderr)
@@ -75,15 +103,117 @@ def get_user_message():
     
     return lines
 
-def wait_for_lock():
-    while not acquire_lock():
-        print("Server busy, please wait...")
-        time.sleep(LOCK_RETRY_INTERVAL)
-    print("\nLock acquired. Sending message to server...")
+def exchange_message(buffer_file, response_file, message_lines, lock_mode='lockfile', slots=1,
+                     poller=None):
+    slot_paths = get_preferred_slots(buffer_file, slots)
+    admission, candidates = acquire_admission(lock_mode, slot_paths)
+    try:
+        if admission is None: slot_buffer = wait_for_lock(candidates)
+        else: slot_buffer = wait_for_lock(candidates, HANDOFF_RETRY_INTERVAL, quiet=True)
+        
+        send_message(slot_buffer, response_file, message_lines)
+        
+        return wait_for_response_ready(response_file, poller)
+    finally:
+        release_admission(admission)
+
+def get_slot_paths(buffer_file, slot, slots):
+    if slots == 1:
+        return buffer_file, LOCKFILE_NAME
+    return f"{buffer_file}.{slot}", f"{LOCKFILE_NAME}.{slot}"
+
+def get_preferred_slots(buffer_file, slots):
+    first = os.getpid() % slots
+    return [get_slot_paths(buffer_file, (first + offset) % slots, slots) for offset in range(slots)]
+
+def acquire_admission(lock_mode, slot_paths):
+    if lock_mode == 'flock':
+        admission, slot_path = acquire_flock(slot_paths)
+        return admission, [slot_path]
+    if lock_mode == 'ticket':
+        return acquire_ticket(len(slot_paths)), slot_paths
+    return None, slot_paths
+
+def acquire_flock(slot_paths):
+    fds = []
+    for slot_path in slot_paths:
+        fd = os.open(slot_path[1] + FLOCK_SUFFIX, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            fds.append(fd)
+            continue
+        for other_fd in fds:
+            os.close(other_fd)
+        return (fd, None), slot_path
+    
+    for other_fd in fds[1:]:
+        os.close(other_fd)
+    print("Server busy, waiting in kernel lock queue...")
+    fcntl.flock(fds[0], fcntl.LOCK_EX)
+    return (fds[0], None), slot_paths[0]
 
-def acquire_lock():
+def acquire_ticket(slots):
+    os.makedirs(TICKET_DIR, exist_ok=True)
+    counter_fd = os.open(os.path.join(TICKET_DIR, TICKET_COUNTER), os.O_CREAT | os.O_RDWR, 0o644)
     try:
-        fd = os.open(LOCKFILE_NAME, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        fcntl.flock(counter_fd, fcntl.LOCK_EX)
+        ticket = int(os.pread(counter_fd, 32, 0) or b'0')
+        os.ftruncate(counter_fd, 0)
+        os.pwrite(counter_fd, str(ticket + 1).encode(), 0)
+        
+        ticket_path = get_ticket_path(ticket)
+        ticket_fd   = os.open(ticket_path, os.O_CREAT | os.O_RDWR, 0o644)
+        fcntl.flock(ticket_fd, fcntl.LOCK_EX)
+    finally:
+        os.close(counter_fd)
+    
+    print(f"Took ticket {ticket}, waiting for earlier clients...")
+    wait_for_earlier_tickets(ticket - slots)
+    return ticket_fd, ticket_path
+
+def get_ticket_path(ticket):
+    return os.path.join(TICKET_DIR, str(ticket))
+
+def wait_for_earlier_tickets(last_ticket):
+    if last_ticket < 0: return
+    earlier = sorted(int(name) for name in os.listdir(TICKET_DIR) if name.isdigit())
+    for ticket in earlier:
+        if ticket > last_ticket: break
+        wait_for_ticket(ticket)
+
+def wait_for_ticket(ticket):
+    try:
+        fd = os.open(get_ticket_path(ticket), os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH)
+    finally:
+        os.close(fd)
+
+def release_admission(admission):
+    if admission is None: return
+    fd, ticket_path = admission
+    if ticket_path is not None:
+        try:
+            os.remove(ticket_path)
+        except FileNotFoundError:
+            pass
+    os.close(fd)
+
+def wait_for_lock(slot_paths, retry_interval=LOCK_RETRY_INTERVAL, quiet=False):
+    while True:
+        for slot_buffer, slot_lock in slot_paths:
+            if acquire_lock(slot_lock):
+                print(f"\nLock {slot_lock} acquired. Sending message to server...")
+                return slot_buffer
+        if not quiet: print("Server busy, please wait...")
+        time.sleep(retry_interval)
+
+def acquire_lock(lockfile=LOCKFILE_NAME):
+    try:
+        fd = os.open(lockfile, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
         os.close(fd)
         return True
     except FileExistsError: return False
@@ -93,40 +223,62 @@ def acquire_lock():
 
 def send_message(buffer_file, response_file, message_lines):
     try:
-        with open(buffer_file, 'w', encoding=ENCODING) as f:
-            f.write(response_file + '\n')
-            for line in message_lines:
-                f.write(line + '\n')
-            f.write(END_MARKER)
+        encoded_lines = [(line + '\n').encode(ENCODING) for line in message_lines]
+        with open(buffer_file, 'wb') as f:
+            f.write((response_file + '\n').encode(ENCODING))
+            f.write(encode_header(sum(len(line) for line in encoded_lines)))
+            for line in encoded_lines:
+                f.write(line)
+            f.write(END_MARKER.encode(ENCODING))
         print("Message sent to server.")
     except Exception as e:
         print(f"Error writing to buffer file: {e}", file=sys.stderr)
         sys.exit(1)
 
-def wait_for_response(response_file):
+def wait_for_response(response_file, poller=None):
+    if not wait_for_response_ready(response_file, poller):
+        return None
+    return read_response(response_file)
+
+def wait_for_response_ready(response_file, poller=None):
     print("Waiting for server response...")
     
+    if poller is None:
+        poller = AdaptivePoller(MIN_POLL_INTERVAL, RESPONSE_POLL_INTERVAL)
+    
     start_time = time.time()
     while time.time() - start_time < RESPONSE_TIMEOUT:
-        if os.path.exists(response_file) and os.path.getsize(response_file) > 0:
-            time.sleep(0.1)
-            
-            try:
-                with open(response_file, 'r', encoding=ENCODING) as f:
-                    content = f.read()
-                
-                if END_MARKER in content:
-                    content = content.split(END_MARKER)[0]
-                
-                return content.strip()
-            except Exception as e:
-                print(f"Error reading response: {e}", file=sys.stderr)
-                return None
+        if os.path.exists(response_file) and response_complete(response_file):
+            poller.hit()
+            return True
         
-        time.sleep(RESPONSE_POLL_INTERVAL)
+        poller.miss()
+        poller.wait(RESPONSE_TIMEOUT - (time.time() - start_time))
     
     print("Timeout waiting for server response", file=sys.stderr)
-    return None
+    return False
+
+def response_complete(response_file):
+    try:
+        with open(response_file, 'rb') as f:
+            return body_complete(f, read_header(f))
+    except Exception:
+        return False
+
+def read_response(response_file):
+    try:
+        with open(response_file, 'rb') as f:
+            return read_body(f, read_header(f)).strip()
+    except Exception as e:
+        print(f"Error reading response: {e}", file=sys.stderr)
+        return None
+
+def stream_response(response_file, output):
+    try:
+        with open(response_file, 'rb') as f:
+            copy_body(f, read_header(f), output)
+    except Exception as e:
+        print(f"Error reading response: {e}", file=sys.stderr)
 
 def cleanup_response_file(response_file):
     try:
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+import codecs
+import io
+import os
+
+END_MARKER    = "\x1b"
+HEADER_MARKER = "\x01"
+ENCODING      = "utf-8"
+CHUNK_SIZE    = 64 * 1024
+
+END_MARKER_BYTES    = END_MARKER.encode(ENCODING)
+HEADER_MARKER_BYTES = HEADER_MARKER.encode(ENCODING)
+
+def encode_header(length):
+    return f"{HEADER_MARKER}{length}\n".encode(ENCODING)
+
+def encode_frame(body):
+    body_bytes = body.encode(ENCODING)
+    return encode_header(len(body_bytes)) + body_bytes + END_MARKER_BYTES
+
+def read_header(f):
+    start = f.tell()
+    line  = f.readline()
+    if line.startswith(HEADER_MARKER_BYTES):
+        try:
+            return int(line[len(HEADER_MARKER_BYTES):])
+        except ValueError:
+            pass
+    f.seek(start)
+    return None
+
+def body_complete(f, length):
+    start = f.tell()
+    try:
+        if length is not None:
+            return os.fstat(f.fileno()).st_size >= start + length + len(END_MARKER_BYTES)
+
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return False
+            if END_MARKER_BYTES in chunk:
+                return True
+    finally:
+        f.seek(start)
+
+def iter_body_chunks(f, length):
+    if length is not None:
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+        return
+
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        end = chunk.find(END_MARKER_BYTES)
+        if end >= 0:
+            yield chunk[:end]
+            return
+        yield chunk
+
+def copy_body(f, length, output):
+    decoder = codecs.getincrementaldecoder(ENCODING)(errors='replace')
+    for chunk in iter_body_chunks(f, length):
+        output.write(decoder.decode(chunk))
+    output.write(decoder.decode(b'', final=True))
+
+def read_body(f, length):
+    output = io.StringIO()
+    copy_body(f, length, output)
+    return output.getvalue()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+import time
+
+BACKOFF_FACTOR = 2.0
+
+class AdaptivePoller:
+    def __init__(self, min_interval, max_interval, factor=BACKOFF_FACTOR):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor       = factor
+        self.interval     = min_interval
+        self.wakeups      = 0
+        self.hits         = 0
+        self.misses       = 0
+
+    def hit(self):
+        self.hits += 1
+        self.interval = self.min_interval
+
+    def miss(self):
+        self.misses += 1
+        self.interval = min(self.interval * self.factor, self.max_interval)
+
+    def record(self, found):
+        if found:
+            self.hit()
+        else:
+            self.miss()
+
+    def wait(self, limit=None):
+        delay = self.interval if limit is None else max(0.0, min(self.interval, limit))
+        time.sleep(delay)
+        self.wakeups += 1
+
+    def stats(self):
+        return {
+            'wakeups':  self.wakeups,
+            'hits':     self.hits,
+            'misses':   self.misses,
+            'interval': self.interval,
+        }
+
+    def format_stats(self):
+        return (f"wakeups={self.wakeups} hits={self.hits} misses={self.misses} "
+                f"current interval={self.interval * 1000:.1f} ms")
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+
+def echo(message_lines):
+    return '\n'.join(message_lines).strip()
+
+def upper(message_lines):
+    return echo(message_lines).upper()
+
+def line_count(message_lines):
+    return f"Received {len([line for line in message_lines if line])} line(s)"
@@ -1,26 +1,35 @@
 #!/usr/bin/env python3
 import argparse
+import importlib
 import os
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-LOCKFILE_NAME = "server.lock"
-END_MARKER    = "\x1b"
-POLL_INTERVAL = 0.5
-ENCODING      = "utf-8"
+from framing import body_complete, copy_body, encode_frame, read_body, read_header
+from polling import AdaptivePoller
+
+LOCKFILE_NAME      = "server.lock"
+END_MARKER         = "\x1b"
+POLL_INTERVAL      = 0.5
+MIN_POLL_INTERVAL  = 0.005
+ENCODING           = "utf-8"
+STALE_LOCK_TIMEOUT = 10
 
 def main():
     args = parse_args()
     
     try:
-        run_server(args.buffer_file)
+        run_server(args.buffer_file, args.slots, args.responder, args.workers)
     except KeyboardInterrupt:
         print("\n\nServer shutting down...")
-        if os.path.exists(LOCKFILE_NAME):
-            try:
-                os.remove(LOCKFILE_NAME)
-            except:
-                pass
+        for slot in range(args.slots):
+            _, lockfile = get_slot_paths(args.buffer_file, slot, args.slots)
+            if os.path.exists(lockfile):
+                try:
+                    os.remove(lockfile)
+                except:
+                    pass
         sys.exit(0)
 
 def parse_args():
@@ -31,64 +40,202 @@ def parse_args():
         'buffer_file',
         help='Path to the server buffer file'
     )
-    return parser.parse_args()
+    parser.add_argument(
+        '--slots',
+        type=int,
+        default=1,
+        help='Number of buffer slots clients can fill concurrently'
+    )
+    parser.add_argument(
+        '--responder',
+        metavar='MODULE:FUNCTION',
+        help='Answer messages automatically with FUNCTION(message_lines) -> str '
+             '(e.g. responders:echo) instead of asking the operator'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Number of threads running the responder concurrently (default: 1)'
+    )
+    args = parser.parse_args()
+    
+    if args.responder:
+        try:
+            args.responder = load_responder(args.responder)
+        except (ImportError, AttributeError, ValueError) as e:
+            parser.error(f"--responder: {e}")
+    elif args.workers is not None:
+        parser.error("--workers requires --responder")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers is None:
+        args.workers = 1
+    return args
+
+def load_responder(spec):
+    module_name, _, function_name = spec.partition(':')
+    if not module_name or not function_name:
+        raise ValueError(f"Responder must be given as MODULE:FUNCTION, got '{spec}'")
+    
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)
 
-def run_server(buffer_file):
+def run_server(buffer_file, slots=1, responder=None, workers=1):
+    slot_paths = [get_slot_paths(buffer_file, slot, slots) for slot in range(slots)]
+    
     print(f"Server starting...")
     print(f"Buffer file: {buffer_file}")
     print(f"Lockfile: {LOCKFILE_NAME}")
+    if slots > 1:
+        print(f"Buffer slots: {slots}")
+    if responder is not None:
+        print(f"Responder: {responder.__module__}.{responder.__name__} ({workers} worker(s))")
     print(f"Waiting for clients...\n")
     
-    while True:
-        if os.path.exists(LOCKFILE_NAME):
-            time.sleep(0.1)
-            
-            response_file, message_lines = read_client_message(buffer_file)
-            
-            if response_file and message_lines is not None:
-                print()
-                print(f"Message received from client (response file: {response_file})")
-                print()
-                print('\n'.join(message_lines))
-                print()
+    pool      = ThreadPoolExecutor(max_workers=workers) if responder is not None else None
+    poller    = AdaptivePoller(MIN_POLL_INTERVAL, POLL_INTERVAL)
+    in_flight = {}
+    next_slot = 0
+    try:
+        while True:
+            active = False
+            for offset in range(slots):
+                slot = (next_slot + offset) % slots
+                slot_buffer, slot_lock = slot_paths[slot]
                 
-                response = get_server_response()
+                if slot in in_flight:
+                    if not in_flight[slot].done():
+                        active = True
+                        continue
+                    error = in_flight.pop(slot).exception()
+                    if error is not None:
+                        print(f"Error answering slot {slot}: {error}", file=sys.stderr)
                 
-                write_response(response_file, response)
+                if not os.path.exists(slot_lock):
+                    continue
                 
-                clear_buffer(buffer_file)
+                active = True
                 
-                try:
-                    os.remove(LOCKFILE_NAME)
-                    print(f"Lockfile removed. Ready for next client.\n")
-                except Exception as e:
-                    print(f"Error removing lockfile: {e}", file=sys.stderr)
-            else:
-                print("Error reading client message", file=sys.stderr)
-                try:
-                    os.remove(LOCKFILE_NAME)
-                except:
-                    pass
-        
-        time.sleep(POLL_INTERVAL)
+                if pool is not None:
+                    if message_complete(slot_buffer) or lock_is_stale(slot_lock):
+                        in_flight[slot] = pool.submit(answer_slot, slot_buffer, slot_lock, responder)
+                    continue
+                
+                if handle_slot(slot_buffer, slot_lock):
+                    next_slot = (slot + 1) % slots
+            
+            poller.record(active)
+            poller.wait()
+    finally:
+        print(f"Polling stats: {poller.format_stats()}")
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
 
 
-def read_client_message(buffer_file):
+def get_slot_paths(buffer_file, slot, slots):
+    if slots == 1:
+        return buffer_file, LOCKFILE_NAME
+    return f"{buffer_file}.{slot}", f"{LOCKFILE_NAME}.{slot}"
+
+
+def handle_slot(buffer_file, lockfile):
+    if not message_complete(buffer_file) and not lock_is_stale(lockfile):
+        return False
+    
     try:
-        with open(buffer_file, 'r', encoding=ENCODING) as f:
-            lines = f.read().split('\n')
+        f, response_file, length = open_client_message(buffer_file)
+    except Exception as e:
+        print(f"Error reading buffer file: {e}", file=sys.stderr)
+        f, response_file = None, None
+    
+    if response_file:
+        print()
+        print(f"Message received from client (response file: {response_file})")
+        print()
+        with f:
+            copy_body(f, length, sys.stdout)
+        print()
+        
+        response = get_server_response()
+        
+        write_response(response_file, response)
         
-        if not lines:
-            return None, None
+        clear_buffer(buffer_file)
+        
+        try:
+            os.remove(lockfile)
+            print(f"Lockfile {lockfile} removed. Ready for next client.\n")
+        except Exception as e:
+            print(f"Error removing lockfile: {e}", file=sys.stderr)
+    else:
+        if f is not None:
+            f.close()
+        print("Error reading client message", file=sys.stderr)
+        try:
+            os.remove(lockfile)
+        except:
+            pass
+    
+    return True
+
+
+def open_client_message(buffer_file):
+    f = open(buffer_file, 'rb')
+    try:
+        response_file = f.readline().decode(ENCODING).strip()
+        length = read_header(f)
+    except Exception:
+        f.close()
+        raise
+    return f, response_file, length
+
+
+def answer_slot(buffer_file, lockfile, responder):
+    try:
+        response_file, message_lines = read_client_message(buffer_file)
         
-        response_file = lines[0].strip()
-        message_lines = []
+        if response_file and message_lines is not None:
+            try:
+                response = responder(message_lines)
+                if not isinstance(response, str):
+                    raise TypeError(f"responder returned {type(response).__name__}, expected str")
+            except Exception as e:
+                print(f"Responder failed: {e}", file=sys.stderr)
+                response = f"Error: {e}"
+            
+            write_response(response_file, response)
+        else:
+            print("Error reading client message", file=sys.stderr)
+    finally:
+        clear_buffer(buffer_file)
         
-        for line in lines[1:]:
-            if END_MARKER in line:
-                message_lines.append(line.split(END_MARKER)[0])
-                break
-            message_lines.append(line)
+        try:
+            os.remove(lockfile)
+        except Exception as e:
+            print(f"Error removing lockfile: {e}", file=sys.stderr)
+
+
+def message_complete(buffer_file):
+    try:
+        f, _, length = open_client_message(buffer_file)
+        with f:
+            return body_complete(f, length)
+    except Exception:
+        return False
+
+
+def lock_is_stale(lockfile):
+    try:
+        return time.time() - os.path.getmtime(lockfile) > STALE_LOCK_TIMEOUT
+    except OSError:
+        return False
+
+
+def read_client_message(buffer_file):
+    try:
+        f, response_file, length = open_client_message(buffer_file)
+        with f:
+            message_lines = read_body(f, length).split('\n')
         
         return response_file, message_lines
     except Exception as e:
@@ -114,9 +261,12 @@ def get_server_response():
 
 
 def write_response(response_file, response):
+    if response.endswith(END_MARKER):
+        response = response[:-len(END_MARKER)]
+    
     try:
-        with open(response_file, 'w', encoding=ENCODING) as f:
-            f.write(response)
+        with open(response_file, 'wb') as f:
+            f.write(encode_frame(response))
         print(f"\nResponse sent to: {response_file}")
     except Exception as e:
         print(f"Error writing response: {e}", file=sys.stderr)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from program import ENGINES, EXECUTORS, count_words, scan_file
+
+DEFAULT_SIZES   = [8, 64]
+DEFAULT_REPEATS = 3
+VOCABULARY      = ['lokomotywa', 'stoi', 'na', 'stacji', 'ciężka', 'ogromna', 'i', 'pot',
+                   'z', 'niej', 'spływa', 'Żółw', 'kot', 'PIES', 'wagon', 'węgiel']
+TREE_SHAPES     = [(1, 16), (2, 6), (4, 3), (7, 2)]
+WORKLOADS       = {
+    'io-bound':  20,
+    'cpu-bound': 1000,
+}
+QUERIES         = {
+    'one word':  ['stoi'],
+    'ten words': ['stoi', 'i', 'żółw', 'kot', 'pies', 'wagon', 'na', 'z', 'pot', 'brak'],
+}
+
+def main():
+    args = parse_args()
+    if args.section in ('all', 'engines'):
+        run_engine_benchmark(args)
+    if args.section in ('all', 'executors'):
+        run_executor_benchmark(args)
+
+def run_engine_benchmark(args):
+    with tempfile.TemporaryDirectory() as workdir:
+        for size_mb in args.sizes:
+            filename = os.path.join(workdir, f'text_{size_mb}mb.txt')
+            write_text(filename, size_mb * 1024 * 1024)
+            size = os.path.getsize(filename)
+
+            print(f"\n=== zad3 engine benchmark ({size / 1024 / 1024:.0f} MiB, best of {args.repeats}) ===")
+            for query_name, words in QUERIES.items():
+                results = {}
+                for engine in ENGINES:
+                    elapsed, counts = measure_scan(filename, words, engine, args.repeats)
+                    results[engine] = counts
+                    print_throughput(f"{query_name:<9} {engine:<5}", size, elapsed)
+                if len({tuple(counts) for counts in results.values()}) != 1:
+                    print(f"  ! engines disagree: {results}")
+
+def run_executor_benchmark(args):
+    print(f"\n=== zad3 executor benchmark (seconds, best of {args.repeats}, {args.workers} workers) ===")
+    print(f"{'tree':<26}" + ''.join(f"{executor:>14}" for executor in EXECUTORS))
+
+    for workload, lines_per_file in WORKLOADS.items():
+        for depth, width in TREE_SHAPES:
+            with tempfile.TemporaryDirectory() as workdir:
+                root, files = write_tree(workdir, depth, width, lines_per_file)
+                times = {}
+                results = set()
+                for executor in EXECUTORS:
+                    elapsed, counts = measure_executor(root, executor, args.workers, args.repeats)
+                    times[executor] = elapsed
+                    results.add(tuple(counts))
+
+            label = f"{workload} d={depth} w={width} ({files})"
+            row = ''.join(f"{times[executor]:>14.3f}" for executor in EXECUTORS)
+            winner = min(times, key=times.get)
+            print(f"{label:<26}{row}  <- {winner}")
+            if len(results) != 1:
+                print(f"  ! executors disagree: {results}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compares zad3 word counting engines and executors')
+    parser.add_argument(
+        '--section',
+        choices=['all', 'engines', 'executors'],
+        default='all',
+        help='Which comparison to run'
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=DEFAULT_SIZES,
+        help='Sizes of the generated input files in MiB'
+    )
+    parser.add_argument(
+        '--repeats',
+        type=int,
+        default=DEFAULT_REPEATS,
+        help='Number of runs per engine or executor; the fastest one is reported'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count(),
+        help='Pool size for the process-pool and thread-pool executors'
+    )
+    return parser.parse_args()
+
+def write_text(filename: str, size: int) -> None:
+    rng = random.Random(0)
+    written = 0
+    with open(filename, 'w', encoding='utf-8') as f:
+        while written < size:
+            line = ' '.join(rng.choice(VOCABULARY) for _ in range(12)) + ',\n'
+            f.write(line)
+            written += len(line.encode('utf-8'))
+
+def write_tree(workdir: str, depth: int, width: int, lines_per_file: int) -> tuple[str, int]:
+    rng = random.Random(depth * 100 + width)
+    root = os.path.join(workdir, 'root.txt')
+    files = 0
+    level = [root]
+
+    for current_depth in range(depth + 1):
+        next_level = []
+        for filename in level:
+            children = []
+            if current_depth < depth:
+                children = [f"{filename[:-4]}_{i}.txt" for i in range(width)]
+            with open(filename, 'w', encoding='utf-8') as f:
+                for _ in range(lines_per_file):
+                    f.write(' '.join(rng.choice(VOCABULARY) for _ in range(12)) + '\n')
+                for child in children:
+                    f.write(f"\\input{{{child}}}\n")
+            files += 1
+            next_level += children
+        level = next_level
+
+    return root, files
+
+def measure_executor(root: str, executor: str, workers: int, repeats: int) -> tuple[float, list[int]]:
+    best = None
+    counts = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        counts = count_words(root, QUERIES['one word'], executor, workers)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, counts
+
+def measure_scan(filename: str, words: list[str], engine: str, repeats: int) -> tuple[float, list[int]]:
+    best = None
+    counts = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        counts, _ = scan_file(filename, words, engine=engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, counts
+
+def print_throughput(label: str, size: int, elapsed: float) -> None:
+    print(f"{label}: {elapsed:.3f} s  ({size / 1024 / 1024 / elapsed:.1f} MiB/s)")
+
+if __name__ == "__main__":
+    main()
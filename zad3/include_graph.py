@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+import json
+import os
+import re
+from collections import defaultdict, deque
+
+class IncludeCycleError(Exception):
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__("cykliczne dyrektywy \\input: " + " -> ".join(cycle))
+
+def match_input_directive(line):
+    match = re.match(r'^\s*\\input\{(.+?)\}\s*$', line)
+    return match.group(1) if match else None
+
+def include_multiplicities(root, graph):
+    nodes = reachable_files(root, graph)
+    indegree = defaultdict(int)
+    for name in nodes:
+        for included_file in graph[name][1]:
+            indegree[included_file] += 1
+    
+    multiplicities = defaultdict(int, {root: 1})
+    ready = deque(name for name in nodes if indegree[name] == 0)
+    processed = 0
+    
+    while ready:
+        name = ready.popleft()
+        processed += 1
+        for included_file in graph[name][1]:
+            multiplicities[included_file] += multiplicities[name]
+            indegree[included_file] -= 1
+            if indegree[included_file] == 0:
+                ready.append(included_file)
+    
+    if processed < len(nodes):
+        raise IncludeCycleError(find_cycle(root, graph))
+    
+    return dict(multiplicities)
+
+def total_counts(root, graph):
+    multiplicities = include_multiplicities(root, graph)
+    totals = [0] * len(graph[root][0])
+    for name, multiplicity in multiplicities.items():
+        for i, count in enumerate(graph[name][0]):
+            totals[i] += count * multiplicity
+    return totals
+
+def reachable_files(root, graph):
+    seen = {root}
+    stack = [root]
+    while stack:
+        for included_file in graph[stack.pop()][1]:
+            if included_file not in seen:
+                seen.add(included_file)
+                stack.append(included_file)
+    return seen
+
+def find_cycle(root, graph):
+    path = [root]
+    on_path = {root}
+    done = set()
+    iterators = [iter(graph[root][1])]
+    
+    while iterators:
+        included_file = next(iterators[-1], None)
+        if included_file is None:
+            finished = path.pop()
+            on_path.discard(finished)
+            done.add(finished)
+            iterators.pop()
+            continue
+        if included_file in on_path:
+            return path[path.index(included_file):] + [included_file]
+        if included_file not in done:
+            path.append(included_file)
+            on_path.add(included_file)
+            iterators.append(iter(graph[included_file][1]))
+    
+    return []
+
+class CountCache:
+    def __init__(self, path, words):
+        self.path = path
+        self.words = [word.lower() for word in words]
+        self.entries = {}
+        self.observed = {}
+        
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+    
+    def get(self, filename):
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        
+        self.observed[filename] = (stat.st_mtime_ns, stat.st_size)
+        entry = self.entries.get(filename)
+        if entry is None or (entry['mtime_ns'], entry['size']) != self.observed[filename]:
+            return None
+        
+        counts = entry['words']
+        if not all(word in counts for word in self.words):
+            return None
+        return [counts[word] for word in self.words], entry['includes']
+    
+    def put(self, filename, result):
+        if filename not in self.observed:
+            return
+        
+        mtime_ns, size = self.observed[filename]
+        entry = self.entries.get(filename)
+        if entry is None or (entry['mtime_ns'], entry['size']) != (mtime_ns, size):
+            entry = {'mtime_ns': mtime_ns, 'size': size, 'includes': [], 'words': {}}
+            self.entries[filename] = entry
+        
+        counts, included_files = result
+        entry['includes'] = list(included_files)
+        entry['words'].update(zip(self.words, counts))
+    
+    def save(self):
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+import mmap
+import os
+import re
+from collections import Counter
+from functools import partial
+
+INPUT_PATTERN = re.compile(rb'^[^\S\n]*\\input\{(.+?)\}[^\S\n]*$', re.MULTILINE)
+ASCII_WORD    = rb'A-Za-z0-9_'
+TOKEN_PATTERN = re.compile(rb'[A-Za-z0-9_\x80-\xff]+')
+WORD_PATTERN  = re.compile(r'\w+')
+BLOCK_SIZE    = 4 * 1024 * 1024
+
+def compile_words(words):
+    alternatives = b'|'.join(b'(' + word_pattern(word) + b')' for word in words)
+    return re.compile(
+        rb'(?<![' + ASCII_WORD + rb'])(?:' + alternatives + rb')(?![' + ASCII_WORD + rb'])'
+    )
+
+def word_pattern(word):
+    parts = []
+    for char in word:
+        variants = sorted({variant.encode('utf-8') for variant in (char, char.lower(), char.upper())
+                           if variant.lower() == char.lower()})
+        if len(variants) == 1:
+            parts.append(re.escape(variants[0]))
+        elif all(len(variant) == 1 for variant in variants):
+            parts.append(b'[' + b''.join(re.escape(variant) for variant in variants) + b']')
+        else:
+            parts.append(b'(?:' + b'|'.join(re.escape(variant) for variant in variants) + b')')
+    return b''.join(parts)
+
+def scan_mmap(filename, words, start=0, end=None):
+    counts = [0] * len(words)
+    included_files = []
+    
+    if os.path.getsize(filename) == 0:
+        return counts, included_files, 0
+    
+    if len(words) == 1 and WORD_PATTERN.fullmatch(words[0]):
+        count_region = partial(count_word_matches, compile_words(words), counts)
+    else:
+        count_region = partial(count_tokens, {word: i for i, word in enumerate(words)}, {}, counts)
+    
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        end = len(buffer) if end is None else end
+        position = start
+        for directive in INPUT_PATTERN.finditer(buffer, start, end):
+            count_region(buffer, position, directive.start())
+            included_files.append(directive.group(1).decode('utf-8'))
+            position = directive.end()
+        count_region(buffer, position, end)
+        lines = count_lines(buffer, start, end)
+    
+    return counts, included_files, lines
+
+def count_word_matches(pattern, counts, buffer, start, end):
+    size = len(buffer)
+    for match in pattern.finditer(buffer, start, end):
+        match_start, match_end = match.span()
+        if match_start > 0 and buffer[match_start - 1] >= 0x80 and is_word_char(char_before(buffer, match_start)):
+            continue
+        if match_end < size and buffer[match_end] >= 0x80 and is_word_char(char_at(buffer, match_end)):
+            continue
+        counts[match.lastindex - 1] += 1
+
+def count_tokens(index, normalized, counts, buffer, start, end):
+    while start < end:
+        block_end = min(start + BLOCK_SIZE, end)
+        if block_end < end:
+            block_end = min(buffer.find(b'\n', block_end, end) + 1 or end, end)
+    
+        for token, occurrences in Counter(TOKEN_PATTERN.findall(buffer, start, block_end)).items():
+            if token not in normalized:
+                normalized[token] = [
+                    index[word] for word in re.findall(r'\w+', token.decode('utf-8', errors='replace').lower())
+                    if word in index
+                ]
+            for i in normalized[token]:
+                counts[i] += occurrences
+        start = block_end
+
+def count_lines(buffer, start, end):
+    lines = sum(buffer[position:min(position + BLOCK_SIZE, end)].count(b'\n')
+                for position in range(start, end, BLOCK_SIZE))
+    if end > start and buffer[end - 1] != ord('\n'):
+        lines += 1
+    return lines
+
+def char_before(buffer, position):
+    start = position - 1
+    while start > max(0, position - 4) and 0x80 <= buffer[start] < 0xC0:
+        start -= 1
+    return buffer[start:position].decode('utf-8', errors='replace')
+
+def char_at(buffer, position):
+    length = 1
+    while length < 4 and position + length < len(buffer) and 0x80 <= buffer[position + length] < 0xC0:
+        length += 1
+    return buffer[position:position + length].decode('utf-8', errors='replace')
+
+def is_word_char(char):
+    return char.isalnum() or char == '_'
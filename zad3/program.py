@@ -1,55 +1,492 @@
 #!/usr/bin/env python3
+import argparse
+import multiprocessing
+import multiprocessing.dummy
 import os
+import selectors
+import struct
 import sys
 import re
+import time
+from collections import Counter
 
-def count_word_in_file(filename, word):
+from include_graph import CountCache, IncludeCycleError, match_input_directive, total_counts
+from mmap_engine import scan_mmap
+from tracing import Tracer
+from word_index import INDEX_FILE, WordIndex
+
+EXECUTORS    = ('fork', 'process-pool', 'thread-pool', 'sequential')
+ENGINES      = ('lines', 'mmap')
+COMMANDS     = ('index', 'query')
+COUNT_FORMAT = struct.Struct('q')
+CHUNK_SIZE   = 64 * 1024 * 1024
+
+tracer = None
+
+class ChildFailedError(Exception):
+    pass
+
+def normalize_words(words):
+    return list(dict.fromkeys(word.lower() for word in words))
+
+def count_words(filename, words, executor='fork', workers=None, cache=None, chunk_size=CHUNK_SIZE,
+                engine='lines'):
+    if executor == 'process-pool':
+        return count_words_with_pool(filename, words, workers, cache, chunk_size, engine)
+    if executor == 'thread-pool':
+        return count_words_with_pool(filename, words, workers, cache, chunk_size, engine, threads=True)
+    if executor == 'sequential':
+        return count_words_sequentially(filename, words, cache, engine)
+    return count_words_in_file(filename, words, engine=engine)
+
+def count_word_in_file(filename, word, engine='lines'):
+    return count_words_in_file(filename, [word], engine=engine)[0]
+
+def count_words_in_file(filename, words, ancestors=(), engine='lines'):
+    words = normalize_words(words)
+    if not os.path.exists(filename):
+        print(f"Error: File {filename} does not exist", file=sys.stderr)
+        return [0] * len(words)
+    
+    path = os.path.realpath(filename)
+    if path in ancestors:
+        raise IncludeCycleError(list(ancestors[ancestors.index(path):]) + [path])
+    ancestors = ancestors + (path,)
+    
+    counts, included_files = scan_file(filename, words, engine=engine)
+    
+    child_pipes = {}
+    for included_file, multiplicity in Counter(included_files).items():
+        pid, read_fd = fork_counter(included_file, words, ancestors, engine)
+        child_pipes[read_fd] = (pid, multiplicity)
+    
+    child_counts = collect_child_counts(child_pipes, len(words))
+    
+    return [count + child_count for count, child_count in zip(counts, child_counts)]
+
+def fork_counter(filename, words, ancestors, engine):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        exit_code = 0
+        try:
+            child_counts = count_words_in_file(filename, words, ancestors, engine)
+            write_counts(write_fd, child_counts)
+        except IncludeCycleError as e:
+            print(f"Błąd: {e}", file=sys.stderr)
+            exit_code = 1
+        except ChildFailedError:
+            exit_code = 1
+        except BaseException as e:
+            print(f"Błąd w procesie potomnym dla pliku {filename}: {e}", file=sys.stderr)
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+    
+    os.close(write_fd)
+    return pid, read_fd
+
+def write_counts(fd, counts):
+    data = b''.join(COUNT_FORMAT.pack(count) for count in counts)
+    while data:
+        written = os.write(fd, data)
+        data = data[written:]
+    os.close(fd)
+
+def collect_child_counts(child_pipes, word_count):
+    counts = [0] * word_count
+    expected_size = COUNT_FORMAT.size * word_count
+    failed = False
+    buffers = {fd: b'' for fd in child_pipes}
+    
+    with selectors.DefaultSelector() as selector:
+        for fd in child_pipes:
+            selector.register(fd, selectors.EVENT_READ)
+    
+        while buffers:
+            for key, _ in selector.select():
+                fd = key.fd
+                chunk = os.read(fd, expected_size - len(buffers[fd]))
+                buffers[fd] += chunk
+    
+                if chunk and len(buffers[fd]) < expected_size:
+                    continue
+    
+                pid, multiplicity = child_pipes[fd]
+                if len(buffers[fd]) == expected_size:
+                    for i, (child_count,) in enumerate(COUNT_FORMAT.iter_unpack(buffers[fd])):
+                        counts[i] += child_count * multiplicity
+                else:
+                    failed = True
+    
+                selector.unregister(fd)
+                os.close(fd)
+                del buffers[fd]
+    
+    for pid, _ in child_pipes.values():
+        os.waitpid(pid, 0)
+    
+    if failed:
+        raise ChildFailedError()
+    
+    return counts
+
+def count_word_with_pool(filename, word, workers=None, cache=None, engine='lines'):
+    return count_words_with_pool(filename, [word], workers, cache, engine=engine)[0]
+
+def count_words_with_pool(filename, words, workers=None, cache=None, chunk_size=CHUNK_SIZE,
+                          engine='lines', threads=False):
+    words = normalize_words(words)
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.dummy if threads else multiprocessing.get_context('fork')
+    tasks   = context.Queue()
+    results = context.Queue()
+    processes = []
+    
+    root = os.path.realpath(filename)
+    graph = {}
+    partial = {}
+    queued = {root}
+    discovered = [root]
+    pending = 0
+    
+    try:
+        while discovered or pending:
+            while discovered:
+                name = discovered.pop()
+                cached = cache.get(name) if cache is not None else None
+                if cached is not None:
+                    add_graph_node(graph, name, cached, queued, discovered)
+                    continue
+    
+                if not processes:
+                    processes = start_pool_workers(context, tasks, results, words, workers, engine)
+                chunks = split_file(name, chunk_size)
+                partial[name] = {}
+                for start, end in chunks:
+                    tasks.put((name, start, end))
+                pending += len(chunks)
+    
+            if pending:
+                name, start, chunk_counts, included_files, remaining = results.get()
+                pending -= 1
+                partial[name][start] = (chunk_counts, included_files, remaining)
+                result = merge_chunks(partial[name])
+                if result is None:
+                    continue
+    
+                del partial[name]
+                if cache is not None:
+                    cache.put(name, result)
+                add_graph_node(graph, name, result, queued, discovered)
+    finally:
+        for _ in processes:
+            tasks.put(None)
+        for process in processes:
+            process.join()
+    
+    return total_counts(root, graph)
+
+def count_words_sequentially(filename, words, cache=None, engine='lines'):
+    words = normalize_words(words)
+    root = os.path.realpath(filename)
+    graph = {}
+    queued = {root}
+    discovered = [root]
+    
+    while discovered:
+        name = discovered.pop()
+        result = cache.get(name) if cache is not None else None
+        if result is None:
+            result = scan_file(name, words, engine=engine)
+            if cache is not None:
+                cache.put(name, result)
+        add_graph_node(graph, name, result, queued, discovered)
+    
+    return total_counts(root, graph)
+
+def split_file(filename, chunk_size):
+    try:
+        size = os.path.getsize(filename)
+    except OSError:
+        return [(0, None)]
+    
+    chunks = []
+    start = 0
+    with open(filename, 'rb') as f:
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                chunks.append((start, None))
+                break
+            f.seek(end)
+            f.readline()
+            end = f.tell()
+            if end >= size:
+                chunks.append((start, None))
+                break
+            chunks.append((start, end))
+            start = end
+    
+    return chunks or [(0, None)]
+
+def merge_chunks(chunks):
+    position = 0
+    while position in chunks and chunks[position][2] is not None:
+        position = chunks[position][2]
+    if position not in chunks:
+        return None
+    
+    counts = None
+    included_files = []
+    for start in sorted(chunks):
+        chunk_counts, chunk_includes, _ = chunks[start]
+        counts = chunk_counts if counts is None else [a + b for a, b in zip(counts, chunk_counts)]
+        included_files += chunk_includes
+    return counts, included_files
+
+def start_pool_workers(context, tasks, results, words, workers, engine):
+    processes = [
+        context.Process(target=pool_worker, args=(tasks, results, words, engine))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+def add_graph_node(graph, name, result, queued, discovered):
+    file_counts, included_files = result
+    includes = [os.path.realpath(included_file) for included_file in included_files]
+    graph[name] = (file_counts, includes)
+    
+    for included_file in includes:
+        if included_file not in queued:
+            queued.add(included_file)
+            discovered.append(included_file)
+
+def pool_worker(tasks, results, words, engine):
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        filename, start, end = task
+        results.put((filename, start) + scan_file(filename, words, start, end, engine) + (end,))
+
+def scan_file(filename, words, start=0, end=None, engine='lines'):
+    if tracer is None:
+        return scan_range(filename, words, start, end, engine)[:2]
+    
+    started = time.perf_counter()
+    counts, included_files, lines = scan_range(filename, words, start, end, engine)
+    tracer.record(filename, start, end, sum(counts), lines, time.perf_counter() - started)
+    return counts, included_files
+
+def scan_range(filename, words, start, end, engine):
     if not os.path.exists(filename):
         print(f"Error: File {filename} does not exist", file=sys.stderr)
-        return 0
+        return [0] * len(words), [], 0
     
-    count = 0
-    child_pids = []
+    if engine == 'mmap':
+        try:
+            return scan_mmap(filename, words, start, end)
+        except Exception as e:
+            print(f"Błąd podczas przetwarzania pliku {filename}: {e}", file=sys.stderr)
+            return [0] * len(words), [], 0
+    
+    word_set = set(words)
+    counter = Counter()
+    included_files = []
+    lines = 0
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            for line in f:
+        with open(filename, 'rb') as f:
+            f.seek(start)
+            remaining = end - start if end is not None else None
+            for raw_line in f:
+                if remaining is not None:
+                    if remaining <= 0:
+                        break
+                    remaining -= len(raw_line)
+                lines += 1
+    
+                line = raw_line.decode('utf-8')
                 included_file = match_input_directive(line)
                 if included_file:
-                    pid = os.fork()
-                    if pid == 0:
-                        child_count = count_word_in_file(included_file, word)
-                        sys.exit(child_count)
-                    else:
-                        child_pids.append(pid)
+                    included_files.append(included_file)
                 else:
-                    words = re.findall(r'\w+', line.lower())
-                    count += words.count(word.lower())
+                    count_words_in_line(line, word_set, counter)
     
     except Exception as e:
         print(f"Błąd podczas przetwarzania pliku {filename}: {e}", file=sys.stderr)
-        return count
     
-    for pid in child_pids:
-        _, status = os.waitpid(pid, 0)
-        exit_code = os.WEXITSTATUS(status)
-        count += exit_code
+    return [counter[word] for word in words], included_files, lines
+
+def count_words_in_line(line, word_set, counter):
+    counter.update(token for token in re.findall(r'\w+', line.lower()) if token in word_set)
+
+def read_words_file(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return [word for line in f for word in line.split()]
+
+def format_counts_table(words, counts):
+    width = max(len("słowo"), *(len(word) for word in words))
+    lines = [f"{'słowo':<{width}}  liczba"]
+    lines += [f"{word:<{width}}  {count}" for word, count in zip(words, counts)]
+    return "\n".join(lines)
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Liczy wystąpienia słów w tekście połączonym dyrektywami \\input{...}'
+    )
+    parser.add_argument('filename', help='ścieżka do pliku z początkiem tekstu')
+    parser.add_argument(
+        'words',
+        nargs='*',
+        help='słowa do zliczenia (bez rozróżniania wielkości liter)'
+    )
+    parser.add_argument(
+        '--words-file',
+        metavar='FILE',
+        help='plik ze słowami do zliczenia (oddzielonymi białymi znakami)'
+    )
+    parser.add_argument(
+        '--executor',
+        choices=EXECUTORS,
+        default='fork',
+        help='fork: osobny proces dla każdej dyrektywy \\input, '
+             'process-pool: stała pula procesów pobierających pliki ze wspólnej kolejki, '
+             'thread-pool: to samo z pulą wątków, '
+             'sequential: wszystkie pliki w jednym procesie i wątku'
+    )
+    parser.add_argument(
+        '--engine',
+        choices=ENGINES,
+        default='lines',
+        help='lines: dekodowanie i dzielenie każdej linii na słowa, '
+             'mmap: wyrażenie regularne na bajtach zmapowanego pliku'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count(),
+        help='liczba procesów lub wątków w puli (domyślnie liczba procesorów)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=CHUNK_SIZE,
+        help='pliki większe niż tyle bajtów są dzielone na fragmenty przetwarzane '
+             'równolegle przez pulę (process-pool, thread-pool)'
+    )
+    parser.add_argument(
+        '--trace',
+        metavar='FILE',
+        help='zapisuj zdarzenia dla każdego pliku w formacie JSON lines do FILE '
+             '("-" oznacza stderr) i wypisz podsumowanie na końcu'
+    )
+    parser.add_argument(
+        '--cache',
+        metavar='FILE',
+        help='plik JSON z zapamiętanymi wynikami dla niezmienionych plików (wszystkie tryby poza fork)'
+    )
+    args = parser.parse_args()
+    
+    if args.words_file:
+        args.words += read_words_file(args.words_file)
+    if not args.words:
+        parser.error('podaj co najmniej jedno słowo lub --words-file')
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers musi być co najmniej 1')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size musi być co najmniej 1')
+    if args.cache and args.executor == 'fork':
+        parser.error('--cache działa tylko z --executor process-pool, thread-pool lub sequential')
+    
+    return args
+
+def parse_command_args():
+    parser = argparse.ArgumentParser(
+        description='Odwrócony indeks słów dla drzewa plików połączonych dyrektywami \\input{...}'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    index_parser = subparsers.add_parser('index', help='zbuduj lub uaktualnij indeks')
+    index_parser.add_argument('filename', help='ścieżka do pliku z początkiem tekstu')
+    
+    query_parser = subparsers.add_parser('query', help='odczytaj liczby wystąpień z indeksu')
+    query_parser.add_argument('filename', help='ścieżka do pliku z początkiem tekstu')
+    query_parser.add_argument('words', nargs='+', help='słowa do zliczenia')
     
-    return count
+    for subparser in (index_parser, query_parser):
+        subparser.add_argument(
+            '--db',
+            default=INDEX_FILE,
+            help=f'plik bazy SQLite z indeksem (domyślnie {INDEX_FILE})'
+        )
+    return parser.parse_args()
 
-def match_input_directive(line):
-    match = re.match(r'^\s*\\input\{(.+?)\}\s*$', line)
-    return match.group(1) if match else None
+def run_command(args):
+    word_index = WordIndex(args.db)
+    try:
+        if args.command == 'index':
+            scanned, total = word_index.update(args.filename)
+            print(f"Przeczytane pliki: {scanned} z {total} (pozostałe bez zmian od ostatniego indeksowania).")
+            return
+    
+        words = normalize_words(args.words)
+        try:
+            counts, stale = word_index.query(args.filename, words)
+        except KeyError:
+            print(f"Błąd: plik {args.filename} nie jest zaindeksowany, uruchom najpierw 'index'",
+                  file=sys.stderr)
+            sys.exit(1)
+        if stale:
+            print(f"Uwaga: pliki zmienione od indeksowania: {len(stale)}, uruchom ponownie 'index'",
+                  file=sys.stderr)
+    finally:
+        word_index.close()
+    
+    print_counts(args.words, words, counts)
+
+def print_counts(requested_words, words, counts):
+    if len(requested_words) == 1:
+        print(f"Słowo '{requested_words[0]}' wystąpiło {counts[0]} razy.")
+    else:
+        print(format_counts_table(words, counts))
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Użycie: python program.py <nazwa_pliku> <słowo>")
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        try:
+            run_command(parse_command_args())
+        except IncludeCycleError as e:
+            print(f"Błąd: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+    
+    args = parse_args()
+    words = normalize_words(args.words)
+    cache = CountCache(args.cache, words) if args.cache else None
+    tracer = Tracer(args.trace) if args.trace else None
+    started = time.perf_counter()
+    
+    try:
+        counts = count_words(args.filename, words, args.executor, args.workers, cache,
+                             args.chunk_size, args.engine)
+    except IncludeCycleError as e:
+        print(f"Błąd: {e}", file=sys.stderr)
+        sys.exit(1)
+    except ChildFailedError:
+        print("Błąd: co najmniej jeden proces potomny zakończył się bez wyniku", file=sys.stderr)
         sys.exit(1)
     
-    filename = sys.argv[1]
-    word = sys.argv[2]
+    if cache is not None:
+        cache.save()
     
-    total_count = count_word_in_file(filename, word)
+    if tracer is not None:
+        print(tracer.format_summary(time.perf_counter() - started), file=sys.stderr)
+        tracer.close()
     
-    print(f"Słowo '{word}' wystąpiło {total_count} razy.")
-
+    print_counts(args.words, words, counts)
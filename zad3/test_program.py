@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Testy automatyczne programu liczącego słowa w plikach z dyrektywami \\input.
+"""
+
+import os
+import sys
+import tempfile
+
+from include_graph import CountCache, IncludeCycleError
+from tracing import Tracer
+from word_index import WordIndex
+import program
+from program import (ENGINES, EXECUTORS, ChildFailedError, count_word_in_file, count_word_with_pool,
+                     count_words, count_words_in_file, count_words_with_pool)
+
+SAMPLE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def count_with_executor(executor, filename, word):
+    return count_words(filename, [word], executor, workers=2)[0]
+
+
+def test_sample_files():
+    """Sprawdza wyniki dla przykładowych plików z wierszem Lokomotywa."""
+    print("=" * 50)
+    print("TEST: Przykładowe pliki")
+    print("=" * 50)
+    
+    previous_dir = os.getcwd()
+    os.chdir(SAMPLE_DIR)
+    try:
+        for executor in EXECUTORS:
+            assert count_with_executor(executor, 'plikA.txt', 'i') == 4, executor
+            assert count_with_executor(executor, 'plikA.txt', 'Stoi') == 2, executor
+            print(f"✓ {executor}: wyniki zgodne z oczekiwanymi")
+    finally:
+        os.chdir(previous_dir)
+    
+    print("\n✓ Test przykładowych plików PASSED\n")
+    return True
+
+
+def test_count_above_255():
+    """Liczba wystąpień powyżej 255 nie może być obcinana modulo 256."""
+    print("=" * 50)
+    print("TEST: Liczba wystąpień powyżej 255")
+    print("=" * 50)
+    
+    matches = 3000
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            with open('main.txt', 'w', encoding='utf-8') as f:
+                f.write("początek\n\\input{sub.txt}\n\\input{sub.txt}\nkoniec słowo\n")
+            with open('sub.txt', 'w', encoding='utf-8') as f:
+                for _ in range(matches // 3):
+                    f.write("Słowo, słowo i SŁOWO.\n")
+    
+            expected = 2 * matches + 1
+            for executor in EXECUTORS:
+                count = count_with_executor(executor, 'main.txt', 'słowo')
+                assert count == expected, f"{executor}: {count} != {expected}"
+                print(f"✓ {executor}: {count} wystąpień")
+        finally:
+            os.chdir(previous_dir)
+    
+    print("\n✓ Test dużej liczby wystąpień PASSED\n")
+    return True
+
+
+def test_multiple_words():
+    """Wiele słów jest liczonych w jednym przejściu, z takim samym wynikiem jak osobno."""
+    print("=" * 50)
+    print("TEST: Wiele słów naraz")
+    print("=" * 50)
+    
+    words = ['i', 'Stoi', 'lokomotywa', 'brak', 'I']
+    previous_dir = os.getcwd()
+    os.chdir(SAMPLE_DIR)
+    try:
+        expected = [count_word_in_file('plikA.txt', word) for word in words[:4]]
+        assert count_words_in_file('plikA.txt', words) == expected
+        assert count_words_with_pool('plikA.txt', words, workers=2) == expected
+        print(f"✓ wyniki {expected} zgodne z osobnymi zapytaniami")
+    finally:
+        os.chdir(previous_dir)
+    
+    print("\n✓ Test wielu słów PASSED\n")
+    return True
+
+
+def test_chunked_file():
+    """Duży plik dzielony na fragmenty daje ten sam wynik co przetwarzanie w całości."""
+    print("=" * 50)
+    print("TEST: Podział dużego pliku na fragmenty")
+    print("=" * 50)
+    
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            with open('big.txt', 'w', encoding='utf-8') as f:
+                for i in range(2000):
+                    f.write(f"wiersz {i}: żółw i kot, KOT\n")
+                    if i % 500 == 0:
+                        f.write("\\input{sub.txt}\n")
+            write_files({'sub.txt': "kot żółw\n"})
+    
+            expected = count_words_in_file('big.txt', ['kot', 'żółw'])
+            assert expected == [4000 + 4, 2000 + 4], expected
+            for chunk_size in (1, 100, 4096, 10 ** 9):
+                counts = count_words_with_pool('big.txt', ['kot', 'żółw'], 3, chunk_size=chunk_size)
+                assert counts == expected, f"chunk_size={chunk_size}: {counts} != {expected}"
+                counts = count_words('big.txt', ['kot', 'żółw'], 'thread-pool', 3, chunk_size=chunk_size)
+                assert counts == expected, f"thread-pool chunk_size={chunk_size}: {counts} != {expected}"
+            print(f"✓ wyniki {expected} niezależne od rozmiaru fragmentu")
+        finally:
+            os.chdir(previous_dir)
+    
+    print("\n✓ Test podziału pliku PASSED\n")
+    return True
+
+
+def test_engines():
+    """Silnik mmap daje te same wyniki co silnik liniowy, także dla polskich znaków."""
+    print("=" * 50)
+    print("TEST: Silniki lines i mmap")
+    print("=" * 50)
+    
+    words = ['kot', 'żółw', 'stoi', 'a1', 'pod_kreślnik', 'ósmy', 'a-b', 'straße']
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            write_files({
+                'main.txt': ("„Kot” — KOT, kotek i kot_2; ŻÓŁW żółwik Żółw\n"
+                             "  \\input{sub.txt}  \n"
+                             "stoi,Stoi.STOI a1 a12 pod_kreślnik ósmy Ósmy ÓSMY óśmy\r\n"
+                             "żkot kotż 1kot kot1 ćkot kot\n"
+                             "a-b Straße STRASSE\n"),
+                'sub.txt': "Kot i żółw\n\\input{empty.txt}\n",
+                'empty.txt': "",
+            })
+            expected = count_words_in_file('main.txt', words, engine='lines')
+            assert expected == [4, 3, 3, 1, 1, 3, 0, 1], expected
+            for engine in ENGINES:
+                assert count_words_in_file('main.txt', words, engine=engine) == expected, engine
+                for chunk_size in (1, 10 ** 9):
+                    counts = count_words_with_pool('main.txt', words, 2, chunk_size=chunk_size,
+                                                   engine=engine)
+                    assert counts == expected, f"{engine}/{chunk_size}: {counts} != {expected}"
+                for word, count in zip(words, expected):
+                    assert count_words_in_file('main.txt', [word], engine=engine) == [count], word
+                print(f"✓ {engine}: {expected}")
+        finally:
+            os.chdir(previous_dir)
+    
+    print("\n✓ Test silników PASSED\n")
+    return True
+
+
+def test_word_index():
+    """Indeks odpowiada tak samo jak przeglądanie plików i jest uaktualniany przyrostowo."""
+    print("=" * 50)
+    print("TEST: Odwrócony indeks słów")
+    print("=" * 50)
+    
+    words = ['kot', 'pies', 'brak']
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            write_files({
+                'main.txt': "Kot i pies\n\\input{a.txt}\n\\input{b.txt}\n",
+                'a.txt': "kot kot\n\\input{b.txt}\n",
+                'b.txt': "pies KOT\n",
+            })
+            word_index = WordIndex('index.sqlite')
+            try:
+                assert word_index.update('main.txt') == (3, 3)
+                counts, stale = word_index.query('main.txt', words)
+                assert counts == count_words_in_file('main.txt', words) == [5, 3, 0], counts
+                assert stale == []
+                print(f"✓ zapytanie z indeksu: {counts}")
+    
+                with open('b.txt', 'a', encoding='utf-8') as f:
+                    f.write("pies\n")
+                assert len(word_index.query('main.txt', words)[1]) == 1
+                assert word_index.update('main.txt') == (1, 3)
+                counts, _ = word_index.query('main.txt', words)
+                assert counts == count_words_in_file('main.txt', words) == [5, 5, 0], counts
+                print(f"✓ po zmianie b.txt przeczytano ponownie tylko ten plik: {counts}")
+            finally:
+                word_index.close()
+        finally:
+            os.chdir(previous_dir)
+    
+    print("\n✓ Test indeksu PASSED\n")
+    return True
+
+
+def test_tracing():
+    """Każdy przetworzony plik daje jedno zdarzenie JSON z liczbą bajtów, linii i wystąpień."""
+    print("=" * 50)
+    print("TEST: Zdarzenia dla przetworzonych plików")
+    print("=" * 50)
+    
+    previous_dir = os.getcwd()
+    os.chdir(SAMPLE_DIR)
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            for executor, engine in [(executor, 'lines') for executor in EXECUTORS] + [('sequential', 'mmap')]:
+                program.tracer = Tracer(os.path.join(workdir, f'{executor}.jsonl'))
+                try:
+                    assert count_words('plikA.txt', ['i'], executor, workers=2, engine=engine) == [4]
+                    events = program.tracer.events()
+                    summary = program.tracer.format_summary(1.0)
+                finally:
+                    program.tracer.close()
+                    program.tracer = None
+    
+                with open(os.path.join(workdir, f'{executor}.jsonl'), encoding='utf-8') as f:
+                    assert len(f.readlines()) == len(events)
+                paths = {os.path.basename(event['path']) for event in events}
+                assert paths == {'plikA.txt', 'plikB.txt', 'plikC.txt', 'plikD.txt'}, paths
+                assert sum(event['matches'] for event in events) == 4
+                assert sum(event['bytes'] for event in events) == sum(
+                    os.path.getsize(name) for name in paths)
+                lines = 0
+                for name in paths:
+                    with open(name, 'rb') as f:
+                        lines += len(f.read().splitlines())
+                assert sum(event['lines'] for event in events) == lines
+                assert "Przetworzone pliki: 4" in summary
+                print(f"✓ {executor} ({engine}): {len(events)} zdarzeń")
+        finally:
+            os.chdir(previous_dir)
+    
+    print("\n✓ Test zdarzeń PASSED\n")
+    return True
+
+
+def write_files(files):
+    for name, content in files.items():
+        with open(name, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+def test_shared_include():
+    """Plik dołączany wielokrotnie liczy się raz i jest mnożony przez krotność."""
+    print("=" * 50)
+    print("TEST: Wspólny plik dołączany w kilku miejscach")
+    print("=" * 50)
+    
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            write_files({
+                'main.txt': "kot\n\\input{left.txt}\n\\input{right.txt}\n\\input{left.txt}\n",
+                'left.txt': "kot pies\n\\input{shared.txt}\n",
+                'right.txt': "\\input{shared.txt}\n",
+                'shared.txt': "kot kot\n",
+            })
+            expected = 1 + 2 * (1 + 2) + 2
+            for executor in EXECUTORS:
+                count = count_with_executor(executor, 'main.txt', 'kot')
+                assert count == expected, f"{executor}: {count} != {expected}"
+                print(f"✓ {executor}: {count} wystąpień")
+            
+            cache = CountCache('cache.json', ['kot'])
+            assert count_word_with_pool('main.txt', 'kot', 2, cache) == expected
+            cache.save()
+            cache = CountCache('cache.json', ['kot'])
+            assert count_word_with_pool('main.txt', 'kot', 2, cache) == expected
+            
+            with open('shared.txt', 'a', encoding='utf-8') as f:
+                f.write("kot\n")
+            cache = CountCache('cache.json', ['kot'])
+            count = count_word_with_pool('main.txt', 'kot', 2, cache)
+            assert count == expected + 3, f"cache: {count} != {expected + 3}"
+            print("✓ cache: zmieniony plik liczony ponownie")
+        finally:
+            os.chdir(previous_dir)
+    
+    print("\n✓ Test wspólnego pliku PASSED\n")
+    return True
+
+
+def test_include_cycle():
+    """Cykliczne dyrektywy \\input kończą się błędem zamiast nieskończonej rekurencji."""
+    print("=" * 50)
+    print("TEST: Cykl dyrektyw \\input")
+    print("=" * 50)
+    
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            write_files({
+                'a.txt': "\\input{b.txt}\n",
+                'b.txt': "\\input{a.txt}\n",
+            })
+            for executor in EXECUTORS:
+                try:
+                    count_with_executor(executor, 'a.txt', 'kot')
+                except (IncludeCycleError, ChildFailedError) as e:
+                    print(f"✓ {executor}: wykryto cykl ({type(e).__name__})")
+                else:
+                    raise AssertionError(f"{executor}: cykl nie został wykryty")
+        finally:
+            os.chdir(previous_dir)
+    
+    print("\n✓ Test cyklu PASSED\n")
+    return True
+
+
+def main():
+    results = [
+        ("Przykładowe pliki", test_sample_files()),
+        ("Liczba wystąpień > 255", test_count_above_255()),
+        ("Wspólny plik dołączany", test_shared_include()),
+        ("Wiele słów naraz", test_multiple_words()),
+        ("Podział dużego pliku", test_chunked_file()),
+        ("Silniki lines i mmap", test_engines()),
+        ("Odwrócony indeks słów", test_word_index()),
+        ("Zdarzenia dla plików", test_tracing()),
+        ("Cykl dyrektyw \\input", test_include_cycle()),
+    ]
+    
+    all_passed = all(passed for _, passed in results)
+    for name, passed in results:
+        print(f"  {name}: {'✓ PASSED' if passed else '✗ FAILED'}")
+    
+    return 0 if all_passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+READ_BLOCK    = 1024 * 1024
+SLOWEST_SHOWN = 5
+
+class Tracer:
+    def __init__(self, destination):
+        if destination == '-':
+            self.fd = sys.stderr.fileno()
+            self.owns_fd = False
+        else:
+            self.fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+            self.owns_fd = True
+
+        log_fd, log_path = tempfile.mkstemp(prefix='zad3_trace_')
+        os.close(log_fd)
+        self.log_fd = os.open(log_path, os.O_RDWR | os.O_APPEND)
+        os.unlink(log_path)
+
+    def record(self, filename, start, end, matches, lines, seconds):
+        size = os.path.getsize(filename) if os.path.exists(filename) else 0
+        end = size if end is None else end
+        event = {
+            'path':    os.path.realpath(filename),
+            'start':   start,
+            'bytes':   max(0, end - start),
+            'lines':   lines,
+            'matches': matches,
+            'seconds': round(seconds, 6),
+            'pid':     os.getpid(),
+            'thread':  threading.current_thread().name,
+            'time':    round(time.time(), 6),
+        }
+        data = (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+        os.write(self.fd, data)
+        os.write(self.log_fd, data)
+
+    def events(self):
+        os.lseek(self.log_fd, 0, os.SEEK_SET)
+        chunks = []
+        while True:
+            chunk = os.read(self.log_fd, READ_BLOCK)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return [json.loads(line) for line in b''.join(chunks).decode('utf-8').splitlines()]
+
+    def format_summary(self, elapsed):
+        per_file = defaultdict(lambda: {'bytes': 0, 'lines': 0, 'matches': 0, 'seconds': 0.0})
+        for event in self.events():
+            totals = per_file[event['path']]
+            for key in totals:
+                totals[key] += event[key]
+
+        total_bytes = sum(totals['bytes'] for totals in per_file.values())
+        lines = [f"Przetworzone pliki: {len(per_file)}, {total_bytes} bajtów w {elapsed:.3f} s "
+                 f"({total_bytes / 1024 / 1024 / max(elapsed, 1e-9):.1f} MiB/s)"]
+
+        slowest = sorted(per_file.items(), key=lambda item: item[1]['seconds'], reverse=True)
+        lines.append("Najwolniejsze pliki:")
+        for path, totals in slowest[:SLOWEST_SHOWN]:
+            lines.append(f"  {totals['seconds'] * 1000:9.1f} ms  {totals['bytes']:>10} B  "
+                         f"{totals['lines']:>8} linii  {totals['matches']:>8} wystąpień  {path}")
+        return "\n".join(lines)
+
+    def close(self):
+        os.close(self.log_fd)
+        if self.owns_fd:
+            os.close(self.fd)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+import os
+import re
+import sqlite3
+import sys
+from collections import Counter
+
+from include_graph import include_multiplicities, match_input_directive
+
+INDEX_FILE = '.zad3_index.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id       INTEGER PRIMARY KEY,
+    path     TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS includes (
+    file_id       INTEGER NOT NULL,
+    position      INTEGER NOT NULL,
+    included_path TEXT NOT NULL,
+    PRIMARY KEY (file_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    word    TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (word, file_id)
+) WITHOUT ROWID;
+"""
+
+class WordIndex:
+    def __init__(self, path=INDEX_FILE):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def update(self, root):
+        root = os.path.realpath(root)
+        stack = [root]
+        seen = {root}
+        scanned = 0
+
+        with self.connection:
+            while stack:
+                path = stack.pop()
+                includes = self.stored_includes(path)
+                if includes is None:
+                    includes = self.reindex_file(path)
+                    scanned += 1
+
+                for included_path in includes:
+                    if included_path not in seen:
+                        seen.add(included_path)
+                        stack.append(included_path)
+
+        return scanned, len(seen)
+
+    def stored_includes(self, path):
+        row = self.connection.execute(
+            'SELECT id, mtime_ns, size FROM files WHERE path = ?', (path,)
+        ).fetchone()
+        if row is None or row[1:] != file_signature(path):
+            return None
+        return self.includes_of(row[0])
+
+    def includes_of(self, file_id):
+        rows = self.connection.execute(
+            'SELECT included_path FROM includes WHERE file_id = ? ORDER BY position', (file_id,)
+        )
+        return [included_path for (included_path,) in rows]
+
+    def reindex_file(self, path):
+        signature = file_signature(path)
+        counter, includes = count_all_words(path)
+
+        self.connection.execute(
+            'INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?) '
+            'ON CONFLICT (path) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size',
+            (path,) + signature
+        )
+        file_id = self.connection.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()[0]
+
+        self.connection.execute('DELETE FROM includes WHERE file_id = ?', (file_id,))
+        self.connection.execute('DELETE FROM postings WHERE file_id = ?', (file_id,))
+        self.connection.executemany(
+            'INSERT INTO includes (file_id, position, included_path) VALUES (?, ?, ?)',
+            ((file_id, position, included_path) for position, included_path in enumerate(includes))
+        )
+        self.connection.executemany(
+            'INSERT INTO postings (word, file_id, count) VALUES (?, ?, ?)',
+            ((word, file_id, count) for word, count in counter.items())
+        )
+        return includes
+
+    def query(self, root, words):
+        root = os.path.realpath(root)
+        ids = dict(self.connection.execute('SELECT path, id FROM files'))
+        if root not in ids:
+            raise KeyError(root)
+
+        graph = {}
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            includes = self.includes_of(ids[path]) if path in ids else []
+            graph[path] = ((), includes)
+            stack.extend(included_path for included_path in includes if included_path not in graph)
+
+        multiplicities = include_multiplicities(root, graph)
+        stale = [path for path in graph if not self.is_current(path)]
+
+        index = {word: i for i, word in enumerate(words)}
+        paths = {file_id: path for path, file_id in ids.items()}
+        counts = [0] * len(words)
+        placeholders = ', '.join('?' * len(words))
+        rows = self.connection.execute(
+            f'SELECT word, file_id, count FROM postings WHERE word IN ({placeholders})', words
+        )
+        for word, file_id, count in rows:
+            multiplicity = multiplicities.get(paths[file_id], 0)
+            counts[index[word]] += count * multiplicity
+
+        return counts, stale
+
+    def is_current(self, path):
+        row = self.connection.execute(
+            'SELECT mtime_ns, size FROM files WHERE path = ?', (path,)
+        ).fetchone()
+        return row == file_signature(path)
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (-1, -1)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def count_all_words(path):
+    counter = Counter()
+    includes = []
+    if not os.path.exists(path):
+        print(f"Error: File {path} does not exist", file=sys.stderr)
+        return counter, includes
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                included_file = match_input_directive(line)
+                if included_file:
+                    includes.append(os.path.realpath(included_file))
+                else:
+                    counter.update(re.findall(r'\w+', line.lower()))
+
+    except Exception as e:
+        print(f"Błąd podczas przetwarzania pliku {path}: {e}", file=sys.stderr)
+
+    return counter, includes
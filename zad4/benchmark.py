@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from record_store import STORES, MemoryStore, MmapStore, build_record_file, read_csv
+
+DEFAULT_SIZES   = [10_000, 1_000_000]
+DEFAULT_LOOKUPS = 100_000
+SURNAMES        = ['Kowalski', 'Nowak', 'Wiśniewski', 'Dąbrowski', 'Lewandowski', 'Wójcik',
+                   'Kamiński', 'Kowalczyk', 'Zieliński', 'Szymański', 'Woźniak', 'Kozłowski']
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            run_store_benchmark(workdir, size, args.lookups)
+
+def run_store_benchmark(workdir: str, size: int, lookups: int) -> None:
+    csv_path = os.path.join(workdir, f'records_{size}.csv')
+    data_path = os.path.join(workdir, f'records_{size}.dat')
+    write_records(csv_path, size)
+    
+    start = time.perf_counter()
+    build_record_file(read_csv(csv_path), data_path)
+    build_time = time.perf_counter() - start
+    
+    print(f"\n=== zad4 record store benchmark ({size} records, {lookups} lookups) ===")
+    print(f"record file built in {build_time:.3f} s ({os.path.getsize(data_path) / 1024 / 1024:.1f} MiB)")
+    print(f"{'store':<8}{'load s':>10}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+    
+    rng = random.Random(size)
+    record_ids = [rng.randrange(1, 2 * size) for _ in range(lookups)]
+    answers = {}
+    for kind in STORES:
+        start = time.perf_counter()
+        store = MmapStore(data_path) if kind == 'mmap' else MemoryStore.from_csv(csv_path)
+        load_time = time.perf_counter() - start
+        
+        latencies, answers[kind] = measure_lookups(store, record_ids)
+        store.close()
+        print(f"{kind:<8}{load_time:>10.3f}{mean(latencies):>10.2f}"
+              f"{percentile(latencies, 50):>10.2f}{percentile(latencies, 99):>10.2f}")
+    
+    if len(set(answers.values())) != 1:
+        print("  ! stores disagree")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compares zad4 record stores')
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=DEFAULT_SIZES,
+        help='Numbers of generated records'
+    )
+    parser.add_argument(
+        '--lookups',
+        type=int,
+        default=DEFAULT_LOOKUPS,
+        help='Number of random lookups per store; about half of them miss'
+    )
+    return parser.parse_args()
+
+def write_records(path: str, size: int) -> None:
+    rng = random.Random(0)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for record_id in range(1, 2 * size, 2):
+            writer.writerow([record_id, rng.choice(SURNAMES)])
+
+def measure_lookups(store, record_ids: list[int]) -> tuple[list[float], tuple]:
+    latencies = []
+    answers = []
+    for record_id in record_ids:
+        start = time.perf_counter()
+        answer = store.get(record_id)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        answers.append(answer)
+    return latencies, tuple(answers)
+
+def mean(values: list[float]) -> float:
+    return sum(values) / len(values)
+
+def percentile(values: list[float], percent: int) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
+
+if __name__ == "__main__":
+    main()
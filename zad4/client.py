@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
+import argparse
 import os
+import select
 import sys
-import struct
 import time
 
-SERVER_FIFO = "/tmp/server_fifo"
+from protocol import (INT, SERVER_FIFO, batch_capacity, encode_batch_lookup, encode_lookup, encode_session_close,
+                      encode_session_lookup, read_batch_response, read_exact, read_session_response)
+
+SESSION_WINDOW = 256
+BATCH_WINDOW   = 8
+TIMEOUT        = 60.0
+ERROR_EVENTS   = select.POLLERR | select.POLLHUP | select.POLLNVAL
 
 def create_client_fifo(client_id: int) -> str:
     client_fifo = f"/tmp/client_fifo_{os.getpid()}_{client_id}"
@@ -20,11 +27,7 @@ def cleanup_client_fifo(client_fifo: str) -> None:
         os.remove(client_fifo)
 
 def send_request(record_id: int, client_fifo: str) -> None:
-    client_fifo_bytes = client_fifo.encode('utf-8')
-    
-    remaining_length = 4 + len(client_fifo_bytes)
-    
-    message = struct.pack('i', remaining_length) + struct.pack('i', record_id) + client_fifo_bytes
+    message = encode_lookup(record_id, client_fifo)
     
     try:
         fd = os.open(SERVER_FIFO, os.O_WRONLY)
@@ -37,32 +40,234 @@ def send_request(record_id: int, client_fifo: str) -> None:
 def receive_response(client_fifo: str) -> str:
     fd = os.open(client_fifo, os.O_RDONLY)
     
-    length_bytes = os.read(fd, 4)
-    if not length_bytes:
+    length_bytes = read_exact(fd, INT.size)
+    if len(length_bytes) < INT.size:
         os.close(fd)
         error_msg = "Failed to receive response length"
         print(f"Error: {error_msg}")
         raise OSError(error_msg)
     
-    response_length = struct.unpack('i', length_bytes)[0]
+    response_length = INT.unpack(length_bytes)[0]
     
-    response_bytes = os.read(fd, response_length)
+    response_bytes = read_exact(fd, response_length)
     os.close(fd)
     
     return response_bytes.decode('utf-8')
 
-def main() -> None:
-    if len(sys.argv) != 2:
-        print("Usage: ./client.py <ID>")
-        print("Example: ./client.py 1")
+def poll_until(poller: select.poll, deadline: float) -> list[tuple[int, int]]:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Timed out waiting for the server")
+    return poller.poll(remaining * 1000)
+
+def run_session(record_ids: list[int], client_fifo: str, window: int, timeout: float) -> dict[int, str]:
+    read_fd = os.open(client_fifo, os.O_RDONLY | os.O_NONBLOCK)
+    keepalive_fd = os.open(client_fifo, os.O_WRONLY)
+    os.set_blocking(read_fd, True)
+    server_fd = os.open(SERVER_FIFO, os.O_WRONLY)
+    
+    poller = select.poll()
+    poller.register(read_fd, select.POLLIN)
+    poller.register(server_fd, 0)
+    
+    responses = {}
+    next_request = 0
+    deadline = time.monotonic() + timeout
+    try:
+        while len(responses) < len(record_ids):
+            while next_request < len(record_ids) and next_request - len(responses) < window:
+                os.write(server_fd, encode_session_lookup(next_request, record_ids[next_request], client_fifo))
+                next_request += 1
+            
+            events = dict(poll_until(poller, deadline))
+            if read_fd in events:
+                result = read_session_response(read_fd)
+                if result is None:
+                    raise OSError("Server closed the session before all responses arrived")
+                request_id, response = result
+                responses[request_id] = response
+                if keepalive_fd is not None:
+                    os.close(keepalive_fd)
+                    keepalive_fd = None
+            elif server_fd in events:
+                raise OSError("Server closed its FIFO before all responses arrived")
+    finally:
+        try:
+            os.write(server_fd, encode_session_close(client_fifo))
+        except OSError:
+            pass
+        os.close(server_fd)
+        if keepalive_fd is not None:
+            os.close(keepalive_fd)
+        os.close(read_fd)
+    
+    return responses
+
+def run_batch(record_ids: list[int], client_fifo: str, window: int, timeout: float) -> tuple[list[str], int]:
+    capacity = batch_capacity(client_fifo)
+    offsets = list(range(0, len(record_ids), capacity))
+    
+    read_fd = os.open(client_fifo, os.O_RDONLY | os.O_NONBLOCK)
+    keepalive_fd = os.open(client_fifo, os.O_WRONLY)
+    os.set_blocking(read_fd, True)
+    server_fd = os.open(SERVER_FIFO, os.O_WRONLY)
+    os.set_blocking(server_fd, False)
+    
+    poller = select.poll()
+    poller.register(read_fd, select.POLLIN)
+    poller.register(server_fd, 0)
+    
+    responses = [None] * len(record_ids)
+    sent = 0
+    received = 0
+    deadline = time.monotonic() + timeout
+    try:
+        while received < len(offsets):
+            can_send = sent < len(offsets) and sent - received < window
+            poller.modify(server_fd, select.POLLOUT if can_send else 0)
+            
+            for fd, event in poll_until(poller, deadline):
+                if event & ERROR_EVENTS:
+                    raise OSError("Server closed its FIFO before all batches were answered")
+                if fd == server_fd and can_send:
+                    offset = offsets[sent]
+                    try:
+                        os.write(server_fd, encode_batch_lookup(offset, record_ids[offset:offset + capacity], client_fifo))
+                        sent += 1
+                    except BlockingIOError:
+                        pass
+                elif fd == read_fd:
+                    result = read_batch_response(read_fd)
+                    if result is None:
+                        raise OSError("Server closed the client FIFO before all batches were answered")
+                    offset, batch = result
+                    responses[offset:offset + len(batch)] = batch
+                    received += 1
+    finally:
+        os.close(server_fd)
+        os.close(keepalive_fd)
+        os.close(read_fd)
+    
+    return responses, len(offsets)
+
+def read_ids_file(path: str) -> list[int]:
+    with open(path, encoding='utf-8') as f:
+        return [int(token) for token in f.read().split()]
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Client for the FIFO database server')
+    parser.add_argument('ids', type=int, nargs='*', help='Record IDs to look up')
+    parser.add_argument(
+        '--ids-file',
+        help='File with whitespace-separated record IDs to look up after the ones given as '
+             'arguments (implies --batch unless --session is given)'
+    )
+    parser.add_argument(
+        '--session',
+        action='store_true',
+        help='Keep one client FIFO open and pipeline all lookups over it'
+    )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Send the IDs in batch frames of up to PIPE_BUF bytes, each answered with one response'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=1,
+        help='Repeat the list of IDs this many times (session and batch mode)'
+    )
+    parser.add_argument(
+        '--window',
+        type=int,
+        help=f'Maximum number of lookups (session mode, default {SESSION_WINDOW}) '
+             f'or batch frames (batch mode, default {BATCH_WINDOW}) in flight'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=TIMEOUT,
+        help='Give up if the whole session or batch run has not been answered within this many seconds'
+    )
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Print only the session or batch summary, not every response'
+    )
+    args = parser.parse_args()
+    if args.session and args.batch:
+        parser.error('--session and --batch are mutually exclusive')
+    if args.ids_file:
+        try:
+            args.ids += read_ids_file(args.ids_file)
+        except (OSError, ValueError) as e:
+            parser.error(f'cannot read {args.ids_file}: {e}')
+        args.batch = not args.session
+    if not args.ids:
+        parser.error('no record IDs given')
+    if not args.session and not args.batch and (len(args.ids) != 1 or args.repeat != 1):
+        parser.error('multiple IDs and --repeat require --session or --batch')
+    if args.window is None:
+        args.window = BATCH_WINDOW if args.batch else SESSION_WINDOW
+    return args
+
+def main_session(args: argparse.Namespace) -> None:
+    record_ids = args.ids * args.repeat
+    client_fifo = create_client_fifo(0)
+    print(f"Client PID: {os.getpid()}")
+    print(f"Session FIFO created: {client_fifo}")
+    
+    try:
+        start = time.perf_counter()
+        responses = run_session(record_ids, client_fifo, args.window, args.timeout)
+        elapsed = time.perf_counter() - start
+    
+        if not args.quiet:
+            for request_id, record_id in enumerate(record_ids):
+                print(f"{record_id}: {responses[request_id]}")
+        print(f"{len(record_ids)} lookups in {elapsed:.3f} s "
+              f"({len(record_ids) / max(elapsed, 1e-9):.0f} lookups/s)")
+    except OSError as e:
+        print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        cleanup_client_fifo(client_fifo)
+        print(f"Client FIFO cleaned up")
+
+def main_batch(args: argparse.Namespace) -> None:
+    record_ids = args.ids * args.repeat
+    client_fifo = create_client_fifo(0)
+    print(f"Client PID: {os.getpid()}")
+    print(f"Batch FIFO created: {client_fifo}")
     
     try:
-        record_id = int(sys.argv[1])
-    except ValueError:
-        print("Error: ID must be an integer")
+        start = time.perf_counter()
+        responses, frames = run_batch(record_ids, client_fifo, args.window, args.timeout)
+        elapsed = time.perf_counter() - start
+        
+        if not args.quiet:
+            for record_id, response in zip(record_ids, responses):
+                print(f"{record_id}: {response}")
+        print(f"{len(record_ids)} lookups in {frames} batch frames in {elapsed:.3f} s "
+              f"({len(record_ids) / max(elapsed, 1e-9):.0f} lookups/s)")
+    except OSError as e:
+        print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        cleanup_client_fifo(client_fifo)
+        print(f"Client FIFO cleaned up")
+
+def main() -> None:
+    args = parse_args()
+    if args.session:
+        main_session(args)
+        return
+    if args.batch:
+        main_batch(args)
+        return
     
+    record_id = args.ids[0]
     print(f"Client PID: {os.getpid()}")
     print(f"Requesting record with ID: {record_id}")
     
@@ -72,14 +277,14 @@ def main() -> None:
     try:
         print("Sending request to server...")
         send_request(record_id, client_fifo)
-        
+    
         print("Waiting for response...")
         response = receive_response(client_fifo)
-        
+    
         print("\n" + "=" * 50)
         print(f"Response from server to client {os.getpid()}: {response}")
         print("=" * 50)
-        
+    
     except Exception as e:
         print(f"Error: {e}")
         import traceback
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+class PendingLoad:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+    
+    def wait(self) -> str | None:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+class LookupCache:
+    def __init__(self, capacity: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: OrderedDict[int, tuple[float, str | None]] = OrderedDict()
+        self.pending: dict[int, PendingLoad] = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'expired': 0, 'evictions': 0}
+    
+    def get(self, key: int, load: Callable[[int], str | None]) -> str | None:
+        return self.get_many([key], lambda keys: {keys[0]: load(keys[0])})[0]
+    
+    def get_many(self, keys: list[int], load_many: Callable[[list[int]], dict[int, str | None]]) -> list[str | None]:
+        values = {}
+        owned: dict[int, PendingLoad] = {}
+        waiting: dict[int, PendingLoad] = {}
+        with self.lock:
+            for key in dict.fromkeys(keys):
+                entry = self.entries.get(key)
+                if entry is not None:
+                    expires_at, value = entry
+                    if self.clock() < expires_at:
+                        self.entries.move_to_end(key)
+                        self.stats['hits'] += 1
+                        values[key] = value
+                        continue
+                    del self.entries[key]
+                    self.stats['expired'] += 1
+                
+                pending = self.pending.get(key)
+                if pending is not None:
+                    self.stats['coalesced'] += 1
+                    waiting[key] = pending
+                else:
+                    owned[key] = self.pending[key] = PendingLoad()
+                    self.stats['misses'] += 1
+        
+        if owned:
+            self.load(owned, load_many)
+            for key, pending in owned.items():
+                values[key] = pending.value
+        for key, pending in waiting.items():
+            values[key] = pending.wait()
+        return [values[key] for key in keys]
+    
+    def load(self, owned: dict[int, PendingLoad], load_many: Callable[[list[int]], dict[int, str | None]]) -> None:
+        try:
+            loaded = load_many(list(owned))
+        except Exception as e:
+            for pending in owned.values():
+                pending.error = e
+            raise
+        else:
+            for key, pending in owned.items():
+                pending.value = loaded.get(key)
+                self.put(key, pending.value)
+        finally:
+            with self.lock:
+                for key in owned:
+                    del self.pending[key]
+            for pending in owned.values():
+                pending.done.set()
+    
+    def put(self, key: int, value: str | None) -> None:
+        if self.capacity <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+    
+    def format_stats(self) -> str:
+        with self.lock:
+            stats = dict(self.stats)
+            size = len(self.entries)
+        requests = stats['hits'] + stats['misses'] + stats['coalesced']
+        hit_rate = (stats['hits'] + stats['coalesced']) / requests * 100 if requests else 0.0
+        return (f"Cache: {size}/{self.capacity} entries, {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['coalesced']} coalesced, {stats['expired']} expired, {stats['evictions']} evictions "
+                f"({hit_rate:.1f}% served without a backend fetch)")
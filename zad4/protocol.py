@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+import os
+import select
+import struct
+
+SERVER_FIFO = "/tmp/server_fifo"
+
+INT = struct.Struct('i')
+
+MAX_FRAME_SIZE = 1024 * 1024
+PIPE_BUF       = select.PIPE_BUF
+
+LOOKUP         = 1
+SESSION_LOOKUP = 2
+SESSION_CLOSE  = 3
+BATCH_LOOKUP   = 4
+
+def encode_frame(frame_type: int, payload: bytes) -> bytes:
+    return INT.pack(INT.size + len(payload)) + INT.pack(frame_type) + payload
+
+def encode_lookup(record_id: int, client_fifo: str) -> bytes:
+    return encode_frame(LOOKUP, INT.pack(record_id) + client_fifo.encode('utf-8'))
+
+def encode_session_lookup(request_id: int, record_id: int, client_fifo: str) -> bytes:
+    return encode_frame(SESSION_LOOKUP, INT.pack(request_id) + INT.pack(record_id) + client_fifo.encode('utf-8'))
+
+def encode_session_close(client_fifo: str) -> bytes:
+    return encode_frame(SESSION_CLOSE, client_fifo.encode('utf-8'))
+
+def encode_batch_lookup(offset: int, record_ids: list[int], client_fifo: str) -> bytes:
+    payload = struct.pack(f'ii{len(record_ids)}i', offset, len(record_ids), *record_ids)
+    return encode_frame(BATCH_LOOKUP, payload + client_fifo.encode('utf-8'))
+
+def batch_capacity(client_fifo: str) -> int:
+    return (PIPE_BUF - 4 * INT.size - len(client_fifo.encode('utf-8'))) // INT.size
+
+def decode_frame(body: bytes) -> tuple:
+    frame_type = INT.unpack_from(body, 0)[0]
+    payload = body[INT.size:]
+    
+    if frame_type == LOOKUP:
+        record_id = INT.unpack_from(payload, 0)[0]
+        return (LOOKUP, record_id, payload[INT.size:].decode('utf-8'))
+    if frame_type == SESSION_LOOKUP:
+        request_id, record_id = struct.unpack_from('ii', payload, 0)
+        return (SESSION_LOOKUP, request_id, record_id, payload[2 * INT.size:].decode('utf-8'))
+    if frame_type == SESSION_CLOSE:
+        return (SESSION_CLOSE, payload.decode('utf-8'))
+    if frame_type == BATCH_LOOKUP:
+        offset, count = struct.unpack_from('ii', payload, 0)
+        record_ids = list(struct.unpack_from(f'{count}i', payload, 2 * INT.size))
+        return (BATCH_LOOKUP, offset, record_ids, payload[(2 + count) * INT.size:].decode('utf-8'))
+    raise ValueError(f"Unknown frame type: {frame_type}")
+
+class FrameDecoder:
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+    
+    def feed(self, data: bytes) -> list[bytes]:
+        self.buffer += data
+        frames = []
+        while len(self.buffer) >= INT.size:
+            length = INT.unpack_from(self.buffer, 0)[0]
+            if length < INT.size or length > self.max_frame_size:
+                self.buffer.clear()
+                raise ValueError(f"Invalid frame length: {length}")
+            if len(self.buffer) < INT.size + length:
+                break
+            frames.append(bytes(self.buffer[INT.size:INT.size + length]))
+            del self.buffer[:INT.size + length]
+        return frames
+    
+    def pending(self) -> int:
+        return len(self.buffer)
+
+def encode_response(response: str) -> bytes:
+    response_bytes = response.encode('utf-8')
+    return INT.pack(len(response_bytes)) + response_bytes
+
+def encode_session_response(request_id: int, response: str) -> bytes:
+    response_bytes = response.encode('utf-8')
+    return INT.pack(INT.size + len(response_bytes)) + INT.pack(request_id) + response_bytes
+
+def encode_batch_response(offset: int, responses: list[str]) -> bytes:
+    body = b''.join(encode_response(response) for response in responses)
+    return INT.pack(2 * INT.size + len(body)) + struct.pack('ii', offset, len(responses)) + body
+
+def read_exact(fd: int, length: int) -> bytes:
+    data = b''
+    while len(data) < length:
+        chunk = os.read(fd, length - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+def read_body(fd: int) -> bytes | None:
+    length_bytes = read_exact(fd, INT.size)
+    if len(length_bytes) < INT.size:
+        return None
+    return read_exact(fd, INT.unpack(length_bytes)[0])
+
+def read_session_response(fd: int) -> tuple[int, str] | None:
+    body = read_body(fd)
+    if body is None:
+        return None
+    
+    request_id = INT.unpack_from(body, 0)[0]
+    return request_id, body[INT.size:].decode('utf-8')
+
+def read_batch_response(fd: int) -> tuple[int, list[str]] | None:
+    body = read_body(fd)
+    if body is None:
+        return None
+    
+    offset, count = struct.unpack_from('ii', body, 0)
+    position = 2 * INT.size
+    responses = []
+    for _ in range(count):
+        length = INT.unpack_from(body, position)[0]
+        position += INT.size
+        responses.append(body[position:position + length].decode('utf-8'))
+        position += length
+    return offset, responses
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import mmap
+import os
+import struct
+
+STORES = ('memory', 'mmap')
+
+HEADER      = struct.Struct('<4sI')
+MAGIC       = b'ZAD4'
+NAME_WIDTH  = 60
+RECORD_ID   = struct.Struct('<i')
+
+class MemoryStore:
+    def __init__(self, records: dict[int, str]):
+        self.records = records
+    
+    @classmethod
+    def from_csv(cls, path: str) -> 'MemoryStore':
+        return cls(dict(read_csv(path)))
+    
+    def get(self, record_id: int) -> str | None:
+        return self.records.get(record_id)
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def head(self, limit: int) -> list[tuple[int, str]]:
+        return sorted(self.records.items())[:limit]
+    
+    def close(self) -> None:
+        pass
+
+class MmapStore:
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if len(self.buffer) < HEADER.size or HEADER.unpack_from(self.buffer, 0)[0] != MAGIC:
+            self.buffer.close()
+            raise ValueError(f"{path} is not a record file")
+        
+        name_width = HEADER.unpack_from(self.buffer, 0)[1]
+        self.record = struct.Struct(f'<i{name_width}s')
+        self.count = (len(self.buffer) - HEADER.size) // self.record.size
+    
+    def get(self, record_id: int) -> str | None:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            current_id = RECORD_ID.unpack_from(self.buffer, self.offset(middle))[0]
+            if current_id < record_id:
+                low = middle + 1
+            elif current_id > record_id:
+                high = middle
+            else:
+                return self.surname(middle)
+        return None
+    
+    def offset(self, index: int) -> int:
+        return HEADER.size + index * self.record.size
+    
+    def surname(self, index: int) -> str:
+        name = self.record.unpack_from(self.buffer, self.offset(index))[1]
+        return name.rstrip(b'\0').decode('utf-8')
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def head(self, limit: int) -> list[tuple[int, str]]:
+        return [
+            (self.record.unpack_from(self.buffer, self.offset(index))[0], self.surname(index))
+            for index in range(min(limit, self.count))
+        ]
+    
+    def close(self) -> None:
+        self.buffer.close()
+
+def open_store(kind: str, path: str | None, default: dict[int, str]) -> MemoryStore | MmapStore:
+    if kind == 'mmap':
+        if path is None:
+            raise ValueError("The mmap store needs a record file (--data)")
+        return MmapStore(path)
+    if path is None:
+        return MemoryStore(dict(default))
+    return MemoryStore.from_csv(path)
+
+def read_csv(path: str) -> list[tuple[int, str]]:
+    records = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for line_number, row in enumerate(csv.reader(f), start=1):
+            if not row:
+                continue
+            if len(row) != 2:
+                raise ValueError(f"{path}:{line_number}: expected 'id,surname', got {row}")
+            try:
+                records.append((int(row[0]), row[1]))
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: invalid record id {row[0]!r}") from None
+    return records
+
+def build_record_file(records: list[tuple[int, str]], path: str, name_width: int = NAME_WIDTH) -> int:
+    record = struct.Struct(f'<i{name_width}s')
+    records = sorted(records)
+    
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, name_width))
+        previous_id = None
+        for record_id, surname in records:
+            if record_id == previous_id:
+                raise ValueError(f"Duplicate record id: {record_id}")
+            name = surname.encode('utf-8')
+            if len(name) > name_width:
+                raise ValueError(f"Surname for id {record_id} is longer than {name_width} bytes")
+            f.write(record.pack(record_id, name))
+            previous_id = record_id
+    os.replace(temporary_path, path)
+    return len(records)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Converts an id,surname CSV file into a sorted record file for the mmap store')
+    parser.add_argument(
+        'csv',
+        help='Input CSV file with one id,surname pair per line'
+    )
+    parser.add_argument(
+        'output',
+        help='Record file to write'
+    )
+    parser.add_argument(
+        '--name-width',
+        type=int,
+        default=NAME_WIDTH,
+        help='Bytes reserved for every surname (UTF-8, zero padded)'
+    )
+    return parser.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    count = build_record_file(read_csv(args.csv), args.output, args.name_width)
+    print(f"Wrote {count} records to {args.output}")
+
+if __name__ == "__main__":
+    main()
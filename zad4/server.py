@@ -1,11 +1,30 @@
 #!/usr/bin/env python3
+import argparse
 import os
+import select
 import signal
 import struct
+import threading
 import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from protocol import (BATCH_LOOKUP, LOOKUP, SERVER_FIFO, SESSION_CLOSE, SESSION_LOOKUP, FrameDecoder,
+                      decode_frame, encode_batch_response, encode_response, encode_session_response)
+from lookup_cache import LookupCache
+from record_store import STORES, MemoryStore, MmapStore, open_store
 
-SERVER_FIFO = "/tmp/server_fifo"
 DELAY_SECONDS = 2
+WORKERS       = 4
+QUEUE_DEPTH   = 64
+CACHE_SIZE    = 1024
+CACHE_TTL     = 60.0
+SLOT_TIMEOUT  = 0.1
+POLL_TIMEOUT  = 500
+READ_SIZE     = 64 * 1024
+NOT_FOUND     = "Nie ma"
+PREVIEW_SIZE  = 5
+LOCK_STRIPES  = 16
 
 DATABASE = {
     1: "Kowalski",
@@ -16,6 +35,19 @@ DATABASE = {
 }
 
 shutdown_flag = False
+delay_seconds = DELAY_SECONDS
+store: MemoryStore | MmapStore | None = None
+cache: LookupCache | None = None
+sessions: dict[str, 'Session'] = {}
+session_lock = threading.Lock()
+response_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+class Session:
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.count = 0
+        self.closed = False
+        self.lock = threading.Lock()
 
 def signal_handler_exit(signum: int, frame) -> None:
     global shutdown_flag
@@ -42,29 +74,28 @@ def cleanup() -> None:
         os.remove(SERVER_FIFO)
         print("Server FIFO removed")
 
-def read_message(fd: int) -> tuple[int, str] | None:
-    length_bytes = os.read(fd, 4)
-    if not length_bytes:
-        return None
-    
-    remaining_length = struct.unpack('i', length_bytes)[0]
-    
-    id_bytes = os.read(fd, 4)
-    if len(id_bytes) < 4:
-        return None
-    
-    record_id = struct.unpack('i', id_bytes)[0]
+def read_messages(fd: int, decoder: FrameDecoder) -> list[tuple]:
+    try:
+        data = os.read(fd, READ_SIZE)
+    except BlockingIOError:
+        return []
     
-    client_queue_path_length = remaining_length - 4
-    client_queue_path = os.read(fd, client_queue_path_length).decode('utf-8')
+    try:
+        frames = decoder.feed(data)
+    except ValueError as e:
+        print(f"Discarding corrupted input: {e}")
+        return []
     
-    return (record_id, client_queue_path)
+    messages = []
+    for body in frames:
+        try:
+            messages.append(decode_frame(body))
+        except (ValueError, struct.error, UnicodeDecodeError) as e:
+            print(f"Discarding malformed frame: {e}")
+    return messages
 
 def send_response(client_queue_path: str, response: str) -> None:
-    response_bytes = response.encode('utf-8')
-    response_length = len(response_bytes)
-    
-    message = struct.pack('i', response_length) + response_bytes
+    message = encode_response(response)
     
     try:
         fd = os.open(client_queue_path, os.O_WRONLY)
@@ -74,70 +105,250 @@ def send_response(client_queue_path: str, response: str) -> None:
         print(f"Error sending response to {client_queue_path}: {e}")
         raise
 
+def send_batch_response(client_queue_path: str, offset: int, responses: list[str]) -> None:
+    message = encode_batch_response(offset, responses)
+    
+    with response_locks[hash(client_queue_path) % LOCK_STRIPES]:
+        fd = os.open(client_queue_path, os.O_WRONLY)
+        try:
+            view = memoryview(message)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+def open_session(client_queue_path: str) -> Session:
+    with session_lock:
+        session = sessions.get(client_queue_path)
+    if session is not None:
+        return session
+    
+    fd = os.open(client_queue_path, os.O_WRONLY | os.O_NONBLOCK)
+    os.set_blocking(fd, True)
+    with session_lock:
+        session = sessions.get(client_queue_path)
+        if session is None:
+            session = sessions[client_queue_path] = Session(fd)
+            fd = None
+    
+    if fd is not None:
+        os.close(fd)
+    else:
+        print(f"Session opened: {client_queue_path}")
+    return session
+
+def send_session_response(client_queue_path: str, request_id: int, response: str) -> None:
+    try:
+        session = open_session(client_queue_path)
+        with session.lock:
+            if session.closed:
+                return
+            os.write(session.fd, encode_session_response(request_id, response))
+            session.count += 1
+    except OSError as e:
+        print(f"Error sending response to {client_queue_path}: {e}")
+        close_session(client_queue_path)
+
+def close_session(client_queue_path: str) -> None:
+    with session_lock:
+        session = sessions.pop(client_queue_path, None)
+    if session is None:
+        return
+    
+    with session.lock:
+        session.closed = True
+        os.close(session.fd)
+    print(f"Session closed: {client_queue_path} ({session.count} responses)")
+
+def fetch(record_id: int) -> str | None:
+    if delay_seconds > 0:
+        print(f"Simulating work delay ({delay_seconds} seconds) for ID={record_id}...")
+        time.sleep(delay_seconds)
+    return store.get(record_id)
+
+def fetch_many(record_ids: list[int]) -> dict[int, str | None]:
+    if delay_seconds > 0:
+        print(f"Simulating work delay ({delay_seconds} seconds) for {len(record_ids)} IDs...")
+        time.sleep(delay_seconds)
+    return {record_id: store.get(record_id) for record_id in record_ids}
+
+def lookup(record_id: int) -> str | None:
+    return cache.get(record_id, fetch)
+
 def process_request(record_id: int, client_queue_path: str) -> None:
     print(f"Processing request: ID={record_id}, Client queue={client_queue_path}")
     
-    print(f"Simulating work delay ({DELAY_SECONDS} seconds)...")
-    time.sleep(DELAY_SECONDS)
+    response = lookup(record_id)
     
-    if record_id in DATABASE:
-        response = DATABASE[record_id]
+    if response is not None:
         print(f"Found: {response}")
     else:
-        response = "Nie ma"
         print(f"Not found")
+        response = NOT_FOUND
     
     send_response(client_queue_path, response)
     print(f"Response sent to client\n")
 
+def process_session_request(request_id: int, record_id: int, client_queue_path: str) -> None:
+    response = lookup(record_id)
+    send_session_response(client_queue_path, request_id, NOT_FOUND if response is None else response)
+
+def process_batch_request(offset: int, record_ids: list[int], client_queue_path: str) -> None:
+    responses = cache.get_many(record_ids, fetch_many)
+    send_batch_response(client_queue_path, offset, [NOT_FOUND if response is None else response for response in responses])
+
+def handle_message(message: tuple) -> None:
+    frame_type = message[0]
+    if frame_type == LOOKUP:
+        process_request(*message[1:])
+    elif frame_type == SESSION_LOOKUP:
+        process_session_request(*message[1:])
+    elif frame_type == SESSION_CLOSE:
+        close_session(message[1])
+    elif frame_type == BATCH_LOOKUP:
+        process_batch_request(*message[1:])
+
+def run_message(message: tuple, slots: threading.BoundedSemaphore) -> None:
+    try:
+        handle_message(message)
+    except Exception as e:
+        print(f"Error processing request: {e}")
+        traceback.print_exc()
+    finally:
+        slots.release()
+
+def dispatch_message(message: tuple, pool: ThreadPoolExecutor, slots: threading.BoundedSemaphore) -> bool:
+    while not slots.acquire(timeout=SLOT_TIMEOUT):
+        if shutdown_flag:
+            return False
+    pool.submit(run_message, message, slots)
+    return True
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='FIFO database server')
+    parser.add_argument(
+        '--delay',
+        type=float,
+        default=DELAY_SECONDS,
+        help='Simulated work delay per lookup in seconds'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=WORKERS,
+        help='Number of worker threads handling lookups'
+    )
+    parser.add_argument(
+        '--queue-depth',
+        type=int,
+        default=QUEUE_DEPTH,
+        help='Maximum number of parsed requests waiting for a free worker; '
+             'the server stops reading its FIFO while the queue is full'
+    )
+    parser.add_argument(
+        '--store',
+        choices=STORES,
+        default='memory',
+        help='Record store: an in-memory dict, or a sorted record file searched through mmap'
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=CACHE_SIZE,
+        help='Maximum number of lookup results kept in the LRU cache (0 disables caching, '
+             'concurrent lookups of the same ID are still coalesced)'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=CACHE_TTL,
+        help='Seconds a cached lookup result stays valid'
+    )
+    parser.add_argument(
+        '--data',
+        help='Records to serve: an id,surname CSV file for the memory store, '
+             'a file built with record_store.py for the mmap store (default: built-in records)'
+    )
+    args = parser.parse_args()
+    
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.queue_depth < 0:
+        parser.error("--queue-depth must not be negative")
+    return args
+
 def main() -> None:
-    global shutdown_flag
+    global shutdown_flag, delay_seconds, store, cache
     
+    args = parse_args()
+    delay_seconds = args.delay
+    cache = LookupCache(args.cache_size, args.cache_ttl)
     setup_signal_handlers()
     
     print("Database Server")
     print("=" * 50)
+    
+    start = time.perf_counter()
+    try:
+        store = open_store(args.store, args.data, DATABASE)
+    except (OSError, ValueError) as e:
+        print(f"Error opening record store: {e}")
+        return
+    print(f"Loaded {len(store)} records ({args.store} store) in {time.perf_counter() - start:.3f} s")
+    
     print("\nDatabase contents:")
-    for record_id, surname in DATABASE.items():
+    for record_id, surname in store.head(PREVIEW_SIZE):
         print(f"  {record_id}: {surname}")
+    if len(store) > PREVIEW_SIZE:
+        print(f"  ... and {len(store) - PREVIEW_SIZE} more")
     print()
     
     create_server_fifo()
     
     print(f"Server PID: {os.getpid()}")
+    print(f"Workers: {args.workers}, queue depth: {args.queue_depth}")
+    print(f"Cache: {args.cache_size} entries, TTL {args.cache_ttl} s")
     print("Server is running. Waiting for requests...")
     print("Send SIGUSR1 to stop the server")
     print("=" * 50)
     print()
     
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+    slots = threading.BoundedSemaphore(args.workers + args.queue_depth)
+    
     try:
         fd = os.open(SERVER_FIFO, os.O_RDONLY | os.O_NONBLOCK)
+        keepalive_fd = os.open(SERVER_FIFO, os.O_WRONLY)
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        decoder = FrameDecoder()
         
         while not shutdown_flag:
             try:
-                os.set_blocking(fd, False)
-                
-                try:
-                    result = read_message(fd)
-                    if result is not None:
-                        record_id, client_queue_path = result
-                        process_request(record_id, client_queue_path)
-                except BlockingIOError:
-                    time.sleep(0.1)
+                if not poller.poll(POLL_TIMEOUT):
                     continue
-                    
+                
+                for message in read_messages(fd, decoder):
+                    if not dispatch_message(message, pool, slots):
+                        break
+            
             except Exception as e:
                 print(f"Error processing request: {e}")
-                import traceback
                 traceback.print_exc()
                 continue
         
+        os.close(keepalive_fd)
         os.close(fd)
-        
+    
     except KeyboardInterrupt:
         print("\n\nServer interrupted by user")
     finally:
+        pool.shutdown(wait=True)
+        for client_queue_path in list(sessions):
+            close_session(client_queue_path)
         cleanup()
+        store.close()
+        print(cache.format_stats())
         print("Server stopped")
 
 if __name__ == "__main__":
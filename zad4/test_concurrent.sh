@@ -14,5 +14,5 @@ echo ""
 wait
 
 echo ""
-echo "All clients finished"
+echo "All clients finished in ${SECONDS} s"
 
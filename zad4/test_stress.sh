@@ -0,0 +1,76 @@
+#!/bin/bash
+
+LEGACY_CLIENTS=${1:-200}
+SESSION_CLIENTS=${2:-8}
+SESSION_REPEAT=${3:-500}
+BATCH_CLIENTS=${4:-8}
+BATCH_REPEAT=${5:-2000}
+
+echo "Stress testing the server"
+echo "========================="
+echo ""
+
+./server.py --delay 0 > /tmp/stress_server.log 2>&1 &
+SERVER_PID=$!
+sleep 1
+
+echo "Server PID: $SERVER_PID"
+echo "Starting $LEGACY_CLIENTS legacy clients, $SESSION_CLIENTS session clients and $BATCH_CLIENTS batch clients..."
+echo ""
+
+RESULTS=$(mktemp -d)
+EXPECTED=("" "Kowalski" "Nowak" "Wiśniewski" "Dąbrowski" "Lewandowski")
+
+for i in $(seq 1 "$LEGACY_CLIENTS"); do
+    ./client.py $(( i % 5 + 1 )) > "$RESULTS/legacy_$i.log" 2>&1 &
+done
+
+for i in $(seq 1 "$SESSION_CLIENTS"); do
+    ./client.py --session 1 2 3 4 5 99 --repeat "$SESSION_REPEAT" --quiet > "$RESULTS/session_$i.log" 2>&1 &
+done
+
+for i in $(seq 1 "$BATCH_CLIENTS"); do
+    ./client.py --batch 1 2 3 4 5 99 --repeat "$BATCH_REPEAT" > "$RESULTS/batch_$i.log" 2>&1 &
+done
+
+wait $(jobs -p | grep -v "^$SERVER_PID$")
+
+FAILURES=0
+
+for i in $(seq 1 "$LEGACY_CLIENTS"); do
+    if ! grep -q ": ${EXPECTED[$(( i % 5 + 1 ))]}$" "$RESULTS/legacy_$i.log"; then
+        echo "Legacy client $i failed:"
+        cat "$RESULTS/legacy_$i.log"
+        FAILURES=$(( FAILURES + 1 ))
+    fi
+done
+
+for i in $(seq 1 "$SESSION_CLIENTS"); do
+    if ! grep -q "^$(( SESSION_REPEAT * 6 )) lookups in" "$RESULTS/session_$i.log"; then
+        echo "Session client $i failed:"
+        cat "$RESULTS/session_$i.log"
+        FAILURES=$(( FAILURES + 1 ))
+    fi
+done
+
+EXPECTED_BATCH=$(printf '1: %s\n2: %s\n3: %s\n4: %s\n5: %s\n99: Nie ma\n' "${EXPECTED[@]:1}")
+
+for i in $(seq 1 "$BATCH_CLIENTS"); do
+    if ! grep -q "^$(( BATCH_REPEAT * 6 )) lookups in" "$RESULTS/batch_$i.log" ||
+       [ "$(grep -E '^[0-9]+: ' "$RESULTS/batch_$i.log" | sort -u)" != "$(echo "$EXPECTED_BATCH" | sort -u)" ]; then
+        echo "Batch client $i failed:"
+        tail -5 "$RESULTS/batch_$i.log"
+        FAILURES=$(( FAILURES + 1 ))
+    fi
+done
+
+kill -SIGUSR1 $SERVER_PID
+wait $SERVER_PID
+rm -rf "$RESULTS"
+
+echo ""
+echo "Stress test finished in ${SECONDS} s with $FAILURES failed clients"
+
+if [ "$FAILURES" -ne 0 ]; then
+    exit 1
+fi